@@ -7,6 +7,11 @@ class Settings(BaseSettings):
     model_dir: Path = Path("/app/model")
     openai_api_key: str = ""
     openai_model: str = "gpt-5-mini-2025-08-07"
+    code_execution_workers: int = 0  # >0 runs LLM code in spawned worker processes
+    llm_max_concurrency: int = 16  # upper bound for the adaptive LLM limiter
+    code_execution_concurrency: int = 4  # execute_python calls in flight
+    prediction_concurrency: int = 8  # run_prediction calls in flight
+    chat_text_flush_interval: float = 0.01  # text-delta batching window; 0 disables
     cors_origins: list[str] = ["http://localhost:3000"]
 
     model_config = {"env_file": ".env", "env_file_encoding": "utf-8"}
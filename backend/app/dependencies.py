@@ -15,6 +15,11 @@ _weather_service: WeatherService | None = None
 _code_execution_service: CodeExecutionService | None = None
 _chat_service: ChatService | None = None
 
+# Providers are ``async def`` so FastAPI resolves them inline on the event loop
+# instead of dispatching each one to the threadpool. They are module-level
+# functions so FastAPI's per-callable introspection cache stays warm; do not
+# wrap them in ``functools.partial`` or lambdas at call sites.
+
 
 def init_services():
     global _data_service, _prediction_service, _scoring_service
@@ -39,34 +44,45 @@ def init_services():
         model=settings.openai_model,
         code_execution_service=_code_execution_service,
         prediction_service=_prediction_service,
+        data_service=_data_service,
+        code_execution_workers=settings.code_execution_workers,
+        llm_max_concurrency=settings.llm_max_concurrency,
+        code_execution_concurrency=settings.code_execution_concurrency,
+        prediction_concurrency=settings.prediction_concurrency,
+        text_flush_interval=settings.chat_text_flush_interval,
     )
 
 
-def get_data_service() -> DataService:
+async def shutdown_services():
+    if _chat_service is not None:
+        await _chat_service.close()
+
+
+async def get_data_service() -> DataService:
     assert _data_service is not None
     return _data_service
 
 
-def get_prediction_service() -> PredictionService:
+async def get_prediction_service() -> PredictionService:
     assert _prediction_service is not None
     return _prediction_service
 
 
-def get_scoring_service() -> ScoringService:
+async def get_scoring_service() -> ScoringService:
     assert _scoring_service is not None
     return _scoring_service
 
 
-def get_upload_service() -> UploadService:
+async def get_upload_service() -> UploadService:
     assert _upload_service is not None
     return _upload_service
 
 
-def get_weather_service() -> WeatherService:
+async def get_weather_service() -> WeatherService:
     assert _weather_service is not None
     return _weather_service
 
 
-def get_chat_service() -> ChatService:
+async def get_chat_service() -> ChatService:
     assert _chat_service is not None
     return _chat_service
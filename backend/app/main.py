@@ -1,19 +1,59 @@
+import asyncio
+import logging
+import time
 from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.routing import Route
 
 from app.config import settings
-from app.dependencies import init_services
+from app.dependencies import init_services, shutdown_services
+
+logger = logging.getLogger(__name__)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    init_services()
+    # Data/model loading and initial scoring are blocking; keep them off the loop
+    await asyncio.to_thread(init_services)
     yield
+    await shutdown_services()
+
+
+class TimingMiddleware:
+    """Log per-request latency.
+
+    Middleware here must stay pure ASGI (``__call__(scope, receive, send)``).
+    ``BaseHTTPMiddleware`` builds Request/Response objects and spawns an extra
+    task per request, and it buffers ``StreamingResponse`` bodies such as the
+    ``/api/chat`` SSE stream.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            logger.debug(
+                "%s %s %.1fms",
+                scope["method"],
+                scope["path"],
+                (time.perf_counter() - start) * 1000,
+            )
 
 
 app = FastAPI(title="Energy Efficiency Monitor", lifespan=lifespan)
 
+app.add_middleware(TimingMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_origins,
@@ -23,9 +63,29 @@ app.add_middleware(
 )
 
 
-@app.get("/")
-async def health():
-    return {"status": "ok"}
+class HealthEndpoint:
+    """Liveness probe served as a raw ASGI app with a pre-encoded body.
+
+    Starlette also routes HEAD here; those responses keep the headers but
+    carry no body.
+    """
+
+    BODY = b'{"status":"ok"}'
+    HEADERS = [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(BODY)).encode()),
+    ]
+
+    async def __call__(self, scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": self.HEADERS})
+        body = b"" if scope["method"] == "HEAD" else self.BODY
+        await send({"type": "http.response.body", "body": body})
+
+
+# Raw routes are not part of the OpenAPI schema; say so explicitly
+app.router.routes.insert(
+    0, Route("/", HealthEndpoint(), methods=["GET"], include_in_schema=False)
+)
 
 
 from app.routers import buildings, upload, chat, weather, predict  # noqa: E402
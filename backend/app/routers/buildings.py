@@ -1,52 +1,125 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+import asyncio
+from datetime import datetime
 
-from app.dependencies import get_data_service, get_scoring_service
+import numpy as np
+import pandas as pd
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response
+
+from app.dependencies import get_data_service, get_prediction_service, get_scoring_service
 from app.services.data_service import DataService
-from app.services.scoring_service import ScoringService
+from app.services.prediction_service import PredictionService
+from app.services.scoring_service import (
+    DEFAULT_SCORING_METHOD,
+    UTILITY_UNITS,
+    BuildingScore,
+    ScoringService,
+    resolve_scoring_method,
+)
+from app.utils.responses import CACHE_CONTROL, ORJSONResponse, make_etag, not_modified
 
 router = APIRouter(tags=["buildings"])
 
+# Number of top-ranked buildings whose predictions are computed ahead of a click
+PREWARM_TOP_N = 5
+
+# Score fields for buildings the selected utility has no score for
+_NO_SCORE_FIELDS = {
+    "anomalyScore": None,
+    "status": "normal",
+    "investmentScore": None,
+    "confidence": "medium",
+    "rank": None,
+}
 
-@router.get("/buildings")
+
+@router.get("/buildings", response_class=ORJSONResponse)
 async def list_buildings(
+    request: Request,
+    background_tasks: BackgroundTasks,
     utility: str = Query("ELECTRICITY"),
-    scoring: str = Query("multi_signal_weighted"),
+    scoring: str = Query(DEFAULT_SCORING_METHOD),
     data_service: DataService = Depends(get_data_service),
     scoring_service: ScoringService = Depends(get_scoring_service),
+    prediction_service: PredictionService = Depends(get_prediction_service),
 ):
-    buildings = data_service.get_all_buildings()
+    scores_version = scoring_service.version
+    etag = make_etag(data_service.version, scores_version)
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+
+    scoring = resolve_scoring_method(scoring)
     scores = scoring_service.get_building_scores(utility, scoring)
-    score_map = {s.building_number: s for s in scores}
-
-    result = []
-    for b in buildings:
-        bn = b["buildingNumber"]
-        sc = score_map.get(bn)
-        result.append(
-            {
-                "buildingNumber": bn,
-                "buildingName": b["buildingName"],
-                "campusName": b["campusName"],
-                "latitude": b["latitude"],
-                "longitude": b["longitude"],
-                "grossArea": b["grossArea"],
-                "anomalyScore": sc.score if sc else None,
-                "status": sc.status if sc else "normal",
-                "investmentScore": sc.investment_score if sc else None,
-                "confidence": sc.confidence if sc else "medium",
-                "rank": sc.rank if sc else None,
-                "utilities": data_service.get_building_utilities(bn),
-            }
+
+    def build() -> tuple[bytes, list[int]]:
+        return _build_list_body(utility, scoring, scores, data_service)
+
+    # Utilities without scores are not cached, so query strings cannot grow it
+    if scores:
+        body, prewarm = data_service.get_buildings_payload(
+            utility, scoring, scores_version, build
         )
+    else:
+        body, prewarm = build()
 
-    return {
+    # Warm the prediction cache for the likeliest next /timeseries requests
+    # once the response has been sent.
+    background_tasks.add_task(prediction_service.prewarm, prewarm, utility)
+
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
+    )
+
+
+def _build_list_body(
+    utility: str,
+    scoring: str,
+    scores: list[BuildingScore],
+    data_service: DataService,
+) -> tuple[bytes, list[int]]:
+    buildings = data_service.get_all_buildings()
+    score_fields = {
+        s.building_number: {
+            "anomalyScore": s.score,
+            "status": s.status,
+            "investmentScore": s.investment_score,
+            "confidence": s.confidence,
+            "rank": s.rank,
+        }
+        for s in scores
+    }
+    utilities_map = data_service.get_all_building_utilities()
+
+    result = [
+        {
+            "buildingNumber": b["buildingNumber"],
+            "buildingName": b["buildingName"],
+            "campusName": b["campusName"],
+            "latitude": b["latitude"],
+            "longitude": b["longitude"],
+            "grossArea": b["grossArea"],
+            **score_fields.get(b["buildingNumber"], _NO_SCORE_FIELDS),
+            "utilities": utilities_map.get(b["buildingNumber"], []),
+        }
+        for b in buildings
+    ]
+
+    ranked = sorted(
+        (item for item in result if item["anomalyScore"] is not None),
+        key=lambda item: item["anomalyScore"],
+        reverse=True,
+    )
+    body = ORJSONResponse({
         "buildings": result,
         "meta": {
             "totalBuildings": len(result),
             "selectedUtility": utility,
             "scoringMethod": scoring,
         },
-    }
+    }).body
+    return body, [item["buildingNumber"] for item in ranked[:PREWARM_TOP_N]]
 
 
 @router.get("/buildings/{building_number}")
@@ -59,7 +132,9 @@ async def get_building(
     if building is None:
         raise HTTPException(status_code=404, detail=f"Building {building_number} not found")
 
-    detail_scores = scoring_service.get_building_detail_scores(building_number)
+    detail_scores = await asyncio.to_thread(
+        scoring_service.get_building_detail_scores, building_number
+    )
 
     return {
         "building": building,
@@ -67,90 +142,86 @@ async def get_building(
     }
 
 
-@router.get("/buildings/{building_number}/timeseries")
+@router.get("/buildings/{building_number}/timeseries", response_class=ORJSONResponse)
 async def get_timeseries(
+    request: Request,
     building_number: int,
     utility: str = Query("ELECTRICITY"),
-    start: str | None = Query(None),
-    end: str | None = Query(None),
+    start: datetime | None = Query(None),
+    end: datetime | None = Query(None),
     resolution: str = Query("hourly"),
     data_service: DataService = Depends(get_data_service),
     scoring_service: ScoringService = Depends(get_scoring_service),
+    prediction_service: PredictionService = Depends(get_prediction_service),
 ):
-    from datetime import datetime
-
-    start_dt = datetime.fromisoformat(start) if start else None
-    end_dt = datetime.fromisoformat(end) if end else None
-
     building = data_service.get_building(building_number)
     if building is None:
         raise HTTPException(status_code=404, detail=f"Building {building_number} not found")
 
-    agg = data_service.get_aggregated_meter_data(building_number, utility, resolution, start_dt, end_dt)
-
-    # Get predictions for this building/utility
-    from app.dependencies import get_prediction_service
+    etag = make_etag(data_service.version)
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+
+    def predict():
+        try:
+            return prediction_service.predict_building(building_number, utility)
+        except Exception:
+            return None
+
+    # Meter aggregation and predictions are independent; run them side by side
+    async with asyncio.TaskGroup() as tg:
+        agg_task = tg.create_task(
+            asyncio.to_thread(
+                data_service.get_aggregated_meter_data,
+                building_number, utility, resolution, start, end,
+            )
+        )
+        pred_task = tg.create_task(asyncio.to_thread(predict))
 
-    prediction_service = get_prediction_service()
-    try:
-        pred_df = prediction_service.predict_building(building_number, utility)
-    except Exception:
-        pred_df = None
+    agg = agg_task.result()
+    pred_df = pred_task.result()
 
     data_points = []
     if pred_df is not None and not pred_df.empty:
         # Aggregate predictions similarly
-        pred_df = pred_df.copy()
-        pred_df["timestamp"] = pred_df["readingtime"]
-
-        if resolution == "hourly":
-            pred_df["bucket"] = pred_df["timestamp"].dt.floor("h")
-        elif resolution == "daily":
-            pred_df["bucket"] = pred_df["timestamp"].dt.floor("D")
-        else:
-            pred_df["bucket"] = pred_df["timestamp"]
-
-        pred_agg = pred_df.groupby("bucket").agg(
-            actual=("energy_per_sqft", "sum"),
-            predicted=("predicted", "sum"),
-        ).reset_index()
-        pred_agg["residual"] = pred_agg["actual"] - pred_agg["predicted"]
+        freq = {"hourly": "h", "daily": "D"}.get(resolution)
+        bucket = pred_df["readingtime"]
+        if freq is not None:
+            bucket = bucket.dt.floor(freq)
+        pred_agg = pred_df.groupby(bucket, sort=True)[["energy_per_sqft", "predicted"]].sum()
 
         # Get grossArea to convert back from per_sqft
         gross_area = building.get("grossArea", 1)
 
-        for _, row in pred_agg.iterrows():
-            data_points.append(
-                {
-                    "timestamp": row["bucket"].isoformat(),
-                    "actual": round(row["actual"] * gross_area, 2),
-                    "predicted": round(row["predicted"] * gross_area, 2),
-                    "residual": round(row["residual"] * gross_area, 2),
-                }
+        actual = pred_agg["energy_per_sqft"].to_numpy(dtype=np.float64)
+        predicted = pred_agg["predicted"].to_numpy(dtype=np.float64)
+        residual = ((actual - predicted) * gross_area).round(2)
+        actual = (actual * gross_area).round(2)
+        predicted = (predicted * gross_area).round(2)
+        timestamps = pred_agg.index.strftime("%Y-%m-%dT%H:%M:%S").tolist()
+
+        data_points = [
+            {"timestamp": t, "actual": a, "predicted": p, "residual": r}
+            for t, a, p, r in zip(
+                timestamps, actual.tolist(), predicted.tolist(), residual.tolist()
             )
-    else:
+        ]
+    elif not agg.empty:
         # Fallback: return actual data only
-        for _, row in agg.iterrows():
-            data_points.append(
-                {
-                    "timestamp": row["timestamp"].isoformat() if hasattr(row["timestamp"], "isoformat") else str(row["timestamp"]),
-                    "actual": round(row["readingvalue_sum"], 2) if "readingvalue_sum" in agg.columns else round(row.get("readingvalue", 0), 2),
-                    "predicted": None,
-                    "residual": None,
-                }
-            )
+        timestamps = pd.DatetimeIndex(agg["timestamp"]).strftime("%Y-%m-%dT%H:%M:%S").tolist()
+        actual = agg["readingvalue_sum"].to_numpy(dtype=float).round(2).tolist()
+        data_points = [
+            {"timestamp": t, "actual": a, "predicted": None, "residual": None}
+            for t, a in zip(timestamps, actual)
+        ]
 
     utilities = data_service.get_building_utilities(building_number)
-    units_map = {
-        "ELECTRICITY": "kWh", "GAS": "varies", "HEAT": "varies",
-        "STEAM": "kg", "COOLING": "ton-hours", "COOLING_POWER": "tons",
-        "STEAMRATE": "varies", "OIL28SEC": "varies",
-    }
 
-    return {
+    return ORJSONResponse({
         "buildingNumber": building_number,
         "utility": utility,
-        "units": units_map.get(utility, "varies"),
+        "units": UTILITY_UNITS.get(utility, "varies"),
         "resolution": resolution,
         "data": data_points,
-    }
+    }, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
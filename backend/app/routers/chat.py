@@ -1,29 +1,39 @@
-from fastapi import APIRouter, Depends
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
 
 from app.dependencies import get_chat_service
 from app.services.chat_service import ChatService
 from app.schemas.chat import ChatRequest
+from app.utils.responses import EventStreamResponse
 
 router = APIRouter(tags=["chat"])
 
 
-@router.post("/chat")
+@router.post(
+    "/chat",
+    openapi_extra={
+        "requestBody": {
+            "content": {"application/json": {"schema": ChatRequest.model_json_schema()}},
+            "required": True,
+        }
+    },
+)
 async def chat(
-    request: ChatRequest,
+    request: Request,
     chat_service: ChatService = Depends(get_chat_service),
 ):
-    messages = [{"role": m.role, "content": m.content} for m in request.messages]
+    # Validate the raw body directly; FastAPI would json.loads() it into a dict first.
+    try:
+        payload = ChatRequest.model_validate_json(await request.body())
+    except ValidationError as e:
+        raise RequestValidationError(
+            [{**err, "loc": ("body", *err["loc"])} for err in e.errors(include_url=False)]
+        )
 
-    async def event_generator():
-        async for event in chat_service.stream_chat(messages):
-            yield event
-
-    return StreamingResponse(
-        event_generator(),
-        media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-        },
+    # ChatMessage is exactly {"role", "content"}; dump all messages in one pass
+    messages = payload.model_dump()["messages"]
+    return EventStreamResponse(
+        chat_service.stream_chat(messages),
+        headers={"x-vercel-ai-ui-message-stream": "v1"},
     )
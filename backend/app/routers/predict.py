@@ -6,6 +6,9 @@ from app.services.prediction_service import (
     ModelNotAvailableError,
     BuildingDataNotFoundError,
     InsufficientDataError,
+    metrics_payload,
+    residual_metrics,
+    tail_records,
 )
 from app.schemas.predict import PredictRequest, PredictResponse
 
@@ -30,26 +33,14 @@ async def predict(
     except InsufficientDataError as e:
         raise HTTPException(status_code=422, detail=str(e))
 
-    residuals = df["residual"]
-    anomaly_score = float(residuals.abs().mean())
-    rmse = float((residuals**2).mean() ** 0.5)
-    mae = float(residuals.abs().mean())
-    mean_residual = float(residuals.mean())
+    metrics = metrics_payload(*residual_metrics(df["residual"]))
 
-    sample = df.tail(20)[
-        ["readingtime", "energy_per_sqft", "predicted", "residual"]
-    ].copy()
-    sample["readingtime"] = sample["readingtime"].astype(str)
-    predictions = sample.to_dict("records")
+    predictions = tail_records(df, 20)
 
     return PredictResponse(
         buildingNumber=request.buildingNumber,
         utility=request.utility,
         predictions=predictions,
-        anomalyScore=round(anomaly_score, 6),
-        metrics={
-            "rmse": round(rmse, 6),
-            "mae": round(mae, 6),
-            "meanResidual": round(mean_residual, 6),
-        },
+        anomalyScore=metrics["mae"],
+        metrics=metrics,
     )
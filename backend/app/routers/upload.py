@@ -1,26 +1,37 @@
+from typing import BinaryIO
+
 from fastapi import APIRouter, Depends, Request, HTTPException
+from pydantic import ValidationError
+from starlette.datastructures import UploadFile
 
 from app.dependencies import get_upload_service
 from app.services.upload_service import UploadService
-from app.schemas.upload import UploadResponse
+from app.schemas.upload import ManualUploadRequest, UploadResponse
 
 router = APIRouter(tags=["upload"])
 
 
-async def _parse_request(request: Request) -> tuple[bytes | None, list[dict] | None]:
-    """Determine if request is file upload (multipart) or JSON body."""
+async def _parse_request(request: Request) -> tuple[BinaryIO | None, list[dict] | None]:
+    """Determine if request is file upload (multipart) or JSON body.
+
+    Uploaded files are returned as the spooled file object rather than read
+    into memory, so the CSV parser can stream from it.
+    """
     content_type = request.headers.get("content-type", "")
-    if "multipart/form-data" in content_type:
+    if content_type.startswith("multipart/"):
         form = await request.form()
         file = form.get("file")
-        if file is None:
+        if not isinstance(file, UploadFile):
             return None, None
-        content = await file.read()
-        return content, None
-    else:
-        body = await request.json()
-        rows = body.get("rows", [])
-        return None, rows if rows else None
+        return file.file, None
+
+    # Parse and validate the raw body in one pass (pydantic-core) instead of
+    # json.loads() into a dict first.
+    try:
+        body = ManualUploadRequest.model_validate_json(await request.body())
+    except ValidationError:
+        return None, None
+    return None, body.rows or None
 
 
 @router.post("/upload/meter", response_model=UploadResponse)
@@ -28,10 +39,10 @@ async def upload_meter(
     request: Request,
     upload_service: UploadService = Depends(get_upload_service),
 ):
-    csv_bytes, json_rows = await _parse_request(request)
+    csv_file, json_rows = await _parse_request(request)
 
-    if csv_bytes is not None:
-        result = upload_service.ingest_meter_csv(csv_bytes)
+    if csv_file is not None:
+        result = upload_service.ingest_meter_csv(csv_file)
     elif json_rows is not None:
         result = upload_service.ingest_meter_json(json_rows)
     else:
@@ -51,10 +62,10 @@ async def upload_weather(
     request: Request,
     upload_service: UploadService = Depends(get_upload_service),
 ):
-    csv_bytes, json_rows = await _parse_request(request)
+    csv_file, json_rows = await _parse_request(request)
 
-    if csv_bytes is not None:
-        result = upload_service.ingest_weather_csv(csv_bytes)
+    if csv_file is not None:
+        result = upload_service.ingest_weather_csv(csv_file)
     elif json_rows is not None:
         result = upload_service.ingest_weather_json(json_rows)
     else:
@@ -74,10 +85,10 @@ async def upload_building(
     request: Request,
     upload_service: UploadService = Depends(get_upload_service),
 ):
-    csv_bytes, json_rows = await _parse_request(request)
+    csv_file, json_rows = await _parse_request(request)
 
-    if csv_bytes is not None:
-        result = upload_service.ingest_building_csv(csv_bytes)
+    if csv_file is not None:
+        result = upload_service.ingest_building_csv(csv_file)
     elif json_rows is not None:
         result = upload_service.ingest_building_json(json_rows)
     else:
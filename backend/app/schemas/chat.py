@@ -8,3 +8,7 @@ class ChatMessage(BaseModel):
 
 class ChatRequest(BaseModel):
     messages: list[ChatMessage]
+
+
+class ExecutePythonArgs(BaseModel):
+    code: str
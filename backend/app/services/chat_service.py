@@ -3,26 +3,100 @@
 Produces custom SSE events — each yield is one ``data: {json}\\n\\n`` SSE frame.
 """
 
+import ast
 import asyncio
-import json
 import logging
-from collections.abc import AsyncGenerator
-
-from openai import AsyncOpenAI
-
+import multiprocessing
+from collections import OrderedDict
+from collections.abc import AsyncGenerator, AsyncIterator
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import AsyncExitStack
+from hashlib import blake2b
+
+import httpx
+import orjson
+from openai import APIError, AsyncAPIResponse, AsyncOpenAI, RateLimitError
+from pydantic import BaseModel, ValidationError
+
+from app.schemas.chat import ExecutePythonArgs
+from app.schemas.predict import PredictRequest
 from app.services.code_execution_service import CodeExecutionService
+from app.services.data_service import DataService
 from app.services.prediction_service import (
     PredictionService,
     BuildingDataNotFoundError,
     InsufficientDataError,
     ModelNotAvailableError,
+    metrics_payload,
+    records_from_columns,
 )
 from app.utils import stream_builder as sse
+from app.utils.rate_limit import AdaptiveLimiter
 
 logger = logging.getLogger(__name__)
 
 MAX_TOOL_ITERATIONS = 5
 STEP_TIMEOUT = 60  # seconds per LLM call + tool execution
+TEXT_FLUSH_COUNT = 8  # text deltas per frame, at most
+TEXT_FLUSH_INTERVAL = 0.01  # seconds a delta may wait for more text; 0 = never
+# Successful, image-free execute_python results kept per stream_chat call by
+# (data version, code) hash. Output is capped at MAX_OUTPUT_LENGTH per stream,
+# so a cache stays well under 1 MB.
+CODE_CACHE_SIZE = 32
+
+# Code touching any of these may have side effects or nondeterministic output,
+# so its results are never reused.
+_UNCACHEABLE_NAMES = frozenset({
+    "open", "input", "eval", "exec", "compile", "__import__", "globals",
+    "os", "sys", "subprocess", "shutil", "pathlib", "Path", "socket",
+    "requests", "urllib", "http", "time", "datetime", "random", "uuid",
+    "secrets", "default_rng", "perf_counter", "monotonic",
+})
+_UNCACHEABLE_ATTRS = frozenset({
+    "random", "rand", "randn", "randint", "choice", "shuffle", "seed",
+    "sample", "permutation", "default_rng", "now", "utcnow", "today",
+    "time_ns", "perf_counter", "monotonic", "savefig", "write",
+    "write_text", "write_bytes", "unlink", "remove", "mkdir", "rmdir",
+    "rename", "to_csv", "to_parquet", "to_excel", "to_json", "to_pickle",
+    "save_model",
+})
+# pd.Timestamp("now"), pd.to_datetime("today") and the like read the clock
+_CLOCK_STRINGS = frozenset({"now", "today"})
+# Wall-clock fields of a run; a replayed result must not report them
+_TIMING_FIELDS = ("executionTime",)
+
+
+def _is_cacheable_code(code: str) -> bool:
+    """True if ``code`` looks like a pure analysis (no I/O, clocks, RNG)."""
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return False
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and node.id in _UNCACHEABLE_NAMES:
+            return False
+        if isinstance(node, ast.Attribute) and node.attr in _UNCACHEABLE_ATTRS:
+            return False
+        if (
+            isinstance(node, ast.Constant)
+            and isinstance(node.value, str)
+            and node.value.strip().lower() in _CLOCK_STRINGS
+        ):
+            return False
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            modules = [a.name for a in node.names]
+            if isinstance(node, ast.ImportFrom):
+                modules.append(node.module or "")
+            # Any component, so numpy.random is caught as well as random
+            if any(
+                part in _UNCACHEABLE_NAMES
+                for m in modules
+                for part in m.split(".")
+            ):
+                return False
+    return True
+
 
 SYSTEM_PROMPT = """\
 You are an Energy Analysis Assistant for Ohio State University's campus buildings.
@@ -211,7 +285,7 @@ TOOLS = [
                     "code": {
                         "type": "string",
                         "description": "Python code to execute",
-                    }
+                    },
                 },
                 "required": ["code"],
             },
@@ -250,6 +324,60 @@ TOOLS = [
 ]
 
 
+_SYSTEM_MESSAGE = {"role": "system", "content": SYSTEM_PROMPT}
+
+# Every request starts with the same system prompt + tools prefix; a stable
+# key routes them to the same provider-side prompt cache. Changes whenever
+# the prefix does.
+_PROMPT_CACHE_KEY = "chat-" + blake2b(
+    orjson.dumps([SYSTEM_PROMPT, TOOLS]), digest_size=8
+).hexdigest()
+
+
+def _prompt_cache_key(messages: list[dict]) -> str:
+    """Cache-routing key for one conversation.
+
+    Chat Completions is stateless, so every tool iteration and every turn
+    resends the whole history. Keying on the opening message as well keeps
+    a conversation's requests, whose prefixes only grow, on the same cache.
+    """
+    if not messages:
+        return _PROMPT_CACHE_KEY
+    opening = (messages[0].get("content") or "").encode()
+    return f"{_PROMPT_CACHE_KEY}-{blake2b(opening, digest_size=8).hexdigest()}"
+
+
+# Argument model per tool in TOOLS
+TOOL_ARGS: dict[str, type[BaseModel]] = {
+    "execute_python": ExecutePythonArgs,
+    "run_prediction": PredictRequest,
+}
+
+
+async def _iter_chunks(response: AsyncAPIResponse) -> AsyncIterator[dict]:
+    """Decode a raw chat-completions SSE body into plain chunk dicts.
+
+    Parsing ``data:`` lines with orjson skips the SDK's per-chunk model
+    construction, which dominates CPU time on long streamed answers.
+    """
+    async for line in response.iter_lines():
+        if not line.startswith("data:"):
+            continue
+        data = line[5:].lstrip()
+        if data.startswith("[DONE]"):
+            return
+        chunk = orjson.loads(data)
+        error = chunk.get("error")
+        if error:
+            message = error.get("message") if isinstance(error, dict) else None
+            raise APIError(
+                message=message or "An error occurred during streaming",
+                request=response.http_request,
+                body=error,
+            )
+        yield chunk
+
+
 class ChatService:
     def __init__(
         self,
@@ -257,55 +385,133 @@ class ChatService:
         model: str,
         code_execution_service: CodeExecutionService,
         prediction_service: PredictionService,
+        data_service: DataService | None = None,
+        code_execution_workers: int = 0,
+        llm_max_concurrency: int = 16,
+        code_execution_concurrency: int = 4,
+        prediction_concurrency: int = 8,
+        text_flush_interval: float = TEXT_FLUSH_INTERVAL,
     ):
-        self._client = AsyncOpenAI(api_key=api_key)
+        self._client = AsyncOpenAI(
+            api_key=api_key,
+            http_client=httpx.AsyncClient(
+                # Keep connections warm across a user's turns (the SDK
+                # default expires them after 5s) and fail a stalled stream
+                # after one step instead of the SDK's 10-minute read timeout.
+                limits=httpx.Limits(
+                    max_connections=256,
+                    max_keepalive_connections=128,
+                    keepalive_expiry=60.0,
+                ),
+                timeout=httpx.Timeout(STEP_TIMEOUT, connect=5.0),
+            ),
+        )
         self._model = model
         self._code_service = code_execution_service
         self._prediction_service = prediction_service
+        self._data_service = data_service
+        # Per-tool limits shared across streams, so parallel tool batches
+        # can't swamp the CPU and code runs can't starve predictions
+        self._tool_semaphores = {
+            "execute_python": asyncio.Semaphore(code_execution_concurrency),
+            "run_prediction": asyncio.Semaphore(prediction_concurrency),
+        }
+        self._tool_waiting = dict.fromkeys(self._tool_semaphores, 0)
+        # Predictions get their own threads, one per semaphore slot, so they
+        # neither queue behind nor crowd out other to_thread work
+        self._prediction_pool = ThreadPoolExecutor(
+            max_workers=prediction_concurrency, thread_name_prefix="chat-prediction"
+        )
+        # Streams in flight to the LLM API; backs off when it returns 429s
+        self._llm_limiter = AdaptiveLimiter(llm_max_concurrency)
+        self._text_flush_interval = text_flush_interval
+        # LLM code holds the GIL for its whole run, so it goes to worker
+        # processes when configured; otherwise it runs in a thread.
+        self._code_workers = code_execution_workers
+        self._code_pool = self._new_code_pool()
+
+    def _new_code_pool(self) -> ProcessPoolExecutor | None:
+        if self._code_workers <= 0:
+            return None
+        return ProcessPoolExecutor(
+            max_workers=self._code_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    async def close(self):
+        """Shut down the tool workers and the LLM HTTP client."""
+        if self._code_pool is not None:
+            self._code_pool.shutdown(wait=False, cancel_futures=True)
+            self._code_pool = None
+        self._prediction_pool.shutdown(wait=False, cancel_futures=True)
+        await self._client.close()
 
     # ── tool execution ──────────────────────────────────────────────
 
-    async def _execute_tool(self, tool_name: str, arguments: dict) -> dict:
-        """Execute a tool call asynchronously and return the result dict."""
+    async def _execute_tool(
+        self,
+        tool_name: str,
+        params: BaseModel,
+        code_cache: OrderedDict[bytes, dict] | None = None,
+    ) -> dict:
+        """Execute a validated tool call asynchronously and return the result dict.
+
+        ``code_cache`` is the calling stream's execute_python cache; without
+        one, code always runs.
+        """
         if tool_name == "execute_python":
-            code = arguments.get("code", "")
-            return await asyncio.to_thread(self._code_service.execute, code)
+            code = params.code
+            key = None
+            if code_cache is not None and _is_cacheable_code(code):
+                # Uploads change the data files the code may read
+                version = self._data_service.version if self._data_service else 0
+                key = blake2b(
+                    b"%d:%s" % (version, code.encode()), digest_size=16
+                ).digest()
+                cached = code_cache.get(key)
+                if cached is not None:
+                    code_cache.move_to_end(key)
+                    return dict(cached)
+            result = await self._run_code(code)
+            # Results with charts carry base64 PNGs, too large to keep around
+            if (
+                key is not None
+                and result.get("exitCode") == 0
+                and not result.get("images")
+            ):
+                code_cache[key] = {
+                    k: v for k, v in result.items() if k not in _TIMING_FIELDS
+                }
+                while len(code_cache) > CODE_CACHE_SIZE:
+                    code_cache.popitem(last=False)
+                return dict(result)
+            return result
 
         if tool_name == "run_prediction":
-            building_number = int(arguments.get("buildingNumber", 0))
-            utility = arguments.get("utility", "ELECTRICITY")
-            weather_overrides = arguments.get("weatherOverrides")
+            building_number = params.buildingNumber
+            utility = params.utility
+            weather_overrides = params.weatherOverrides
             try:
-                df = await asyncio.to_thread(
-                    self._prediction_service.predict_building,
+                stats = await asyncio.get_running_loop().run_in_executor(
+                    self._prediction_pool,
+                    self._prediction_service.predict_building_stats,
                     building_number,
                     utility,
                     weather_overrides,
+                    10,
                 )
-                residuals = df["residual"]
-                anomaly_score = float(residuals.abs().mean())
-                rmse = float((residuals**2).mean() ** 0.5)
-                mae = float(residuals.abs().mean())
-                mean_residual = float(residuals.mean())
-
-                sample = df.tail(10)[
-                    ["readingtime", "energy_per_sqft", "predicted", "residual"]
-                ].copy()
-                sample["readingtime"] = sample["readingtime"].astype(str)
+                mae, rmse, mean_residual = stats["metrics"]
+                metrics = metrics_payload(mae, rmse, mean_residual)
 
                 return {
                     "buildingNumber": building_number,
                     "utility": utility,
-                    "predictions": sample.to_dict("records"),
-                    "anomalyScore": round(anomaly_score, 6),
-                    "metrics": {
-                        "rmse": round(rmse, 6),
-                        "mae": round(mae, 6),
-                        "meanResidual": round(mean_residual, 6),
-                    },
+                    "predictions": records_from_columns(stats["tail"]),
+                    "anomalyScore": metrics["mae"],
+                    "metrics": metrics,
                     "summary": (
                         f"Building {building_number} ({utility}): "
-                        f"anomaly score {anomaly_score:.4f}, "
+                        f"anomaly score {mae:.4f}, "
                         f"RMSE {rmse:.4f}, MAE {mae:.4f}"
                     ),
                 }
@@ -320,161 +526,297 @@ class ChatService:
 
         return {"error": f"Unknown tool: {tool_name}"}
 
+    async def _run_code(self, code: str) -> dict:
+        """Run LLM code in the worker pool (or a thread when disabled)."""
+        if self._code_pool is None:
+            return await asyncio.to_thread(self._code_service.execute, code)
+        pool = self._code_pool
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                pool, self._code_service.execute, code
+            )
+        except BrokenProcessPool:
+            # A worker died (e.g. the code called os._exit); start fresh
+            logger.warning("Code execution worker died; restarting pool")
+            if self._code_pool is pool:
+                pool.shutdown(wait=False, cancel_futures=True)
+                self._code_pool = self._new_code_pool()
+            return {"error": "Code execution worker crashed"}
+
+    async def _execute_tool_limited(
+        self,
+        tool_name: str,
+        arguments: dict,
+        code_cache: OrderedDict[bytes, dict] | None = None,
+    ) -> dict:
+        """Validate, then run a tool under its concurrency limit and the step timeout."""
+        args_model = TOOL_ARGS.get(tool_name)
+        if args_model is None:
+            return {"error": f"Unknown tool: {tool_name}"}
+        try:
+            params = args_model.model_validate(arguments)
+        except ValidationError as e:
+            # Malformed calls are answered without queueing for a slot
+            problems = "; ".join(
+                f"{'.'.join(map(str, err['loc'])) or 'arguments'}: {err['msg']}"
+                for err in e.errors()
+            )
+            return {"error": f"Invalid arguments for {tool_name}: {problems}"}
+
+        sem = self._tool_semaphores.get(tool_name)
+        if sem is not None:
+            if sem.locked():
+                self._tool_waiting[tool_name] += 1
+                logger.info(
+                    "Tool %s queued (%d waiting)",
+                    tool_name,
+                    self._tool_waiting[tool_name],
+                )
+                try:
+                    await sem.acquire()
+                finally:
+                    self._tool_waiting[tool_name] -= 1
+            else:
+                await sem.acquire()
+        try:
+            async with asyncio.timeout(STEP_TIMEOUT):
+                return await self._execute_tool(tool_name, params, code_cache)
+        except TimeoutError:
+            return {"error": f"Tool execution timed out after {STEP_TIMEOUT}s"}
+        finally:
+            if sem is not None:
+                sem.release()
+
     # ── main stream ─────────────────────────────────────────────────
 
     async def stream_chat(
         self, messages: list[dict]
-    ) -> AsyncGenerator[str, None]:
+    ) -> AsyncGenerator[bytes, None]:
         """Stream chat completion with tool-use loop.
 
         Yields custom SSE events.
         """
-        full_messages = [{"role": "system", "content": SYSTEM_PROMPT}] + messages
+        full_messages = [_SYSTEM_MESSAGE, *messages]
+        cache_key = _prompt_cache_key(messages)
+        loop = asyncio.get_running_loop()
+        # Loop-invariant lookups, bound once per chat
+        create = self._client.chat.completions.with_streaming_response.create
+        model = self._model
+        limiter = self._llm_limiter
+        # Scoped to this call: results are never shared across users or chats
+        code_cache: OrderedDict[bytes, dict] = OrderedDict()
 
         yield sse.metadata()
 
-        for _iteration in range(MAX_TOOL_ITERATIONS):
+        for _ in range(MAX_TOOL_ITERATIONS):
             # ── call LLM ────────────────────────────────────────
             yield sse.status("thinking")
 
-            try:
-                stream = await asyncio.wait_for(
-                    self._client.chat.completions.create(
-                        model=self._model,
-                        messages=full_messages,
-                        tools=TOOLS,
-                        stream=True,
-                    ),
-                    timeout=STEP_TIMEOUT,
-                )
-            except asyncio.TimeoutError:
-                yield sse.error("LLM request timed out")
-                yield sse.done()
-                return
-            except Exception as e:
-                logger.error("LLM API error: %s", e)
-                yield sse.error(f"LLM API error: {e}")
-                yield sse.done()
-                return
-
-            # ── stream response chunks ──────────────────────────
-            tool_calls_acc: dict[int, dict] = {}
-            has_tool_calls = False
-            assistant_content = ""
+            tool_calls_acc: list[dict | None] = []  # by tool-call index
+            turn_finish: str | None = None
+            content_parts: list[str] = []
+            flushed = 0  # content_parts[flushed:] not yet sent to the client
+            next_flush = 0.0
+
+            # The slot covers the request and its stream, not tool execution
+            async with limiter.slot() as slot, AsyncExitStack() as stack:
+                try:
+                    # Deadline in this task; wait_for would wrap it in another
+                    async with asyncio.timeout(STEP_TIMEOUT):
+                        response = await stack.enter_async_context(
+                            create(
+                                model=model,
+                                messages=full_messages,
+                                tools=TOOLS,
+                                # extra_body: older SDKs reject the kwarg
+                                extra_body={"prompt_cache_key": cache_key},
+                                stream=True,
+                            )
+                        )
+                except TimeoutError:
+                    yield sse.error("LLM request timed out")
+                    yield sse.done()
+                    return
+                except Exception as e:
+                    slot.throttled = isinstance(e, RateLimitError)
+                    logger.error("LLM API error: %s", e)
+                    yield sse.error(f"LLM API error: {e}")
+                    yield sse.done()
+                    return
+
+                # ── stream response chunks ──────────────────────
+                chunks = _iter_chunks(response)
+                # Read in flight while coalesced text waits for its deadline
+                next_chunk: asyncio.Future | None = None
+                try:
+                    while True:
+                        if flushed < len(content_parts):
+                            # Don't let a pause upstream (e.g. the model
+                            # thinking before a tool call) hold back text
+                            # past its flush interval
+                            next_chunk = asyncio.ensure_future(anext(chunks, None))
+                            await asyncio.wait(
+                                (next_chunk,), timeout=max(next_flush - loop.time(), 0)
+                            )
+                            if not next_chunk.done():
+                                yield sse.text_delta("".join(content_parts[flushed:]))
+                                flushed = len(content_parts)
+                                next_flush = loop.time() + self._text_flush_interval
+                            chunk = await next_chunk
+                            next_chunk = None
+                        else:
+                            chunk = await anext(chunks, None)
+                        if chunk is None:
+                            break
+                        choices = chunk.get("choices")
+                        if not choices:
+                            continue
+                        choice = choices[0]
+                        delta = choice.get("delta")
+                        if delta is None:
+                            continue
+                        finish_reason = choice.get("finish_reason")
+                        content = delta.get("content")
+                        tool_calls = delta.get("tool_calls")
+
+                        # Text delta, coalesced so each frame carries a
+                        # few tokens instead of one. Pending text is checked
+                        # on every chunk and always sent before tool-call
+                        # fragments, whose arguments may stream for a while.
+                        if content:
+                            content_parts.append(content)
+                        if flushed < len(content_parts):
+                            now = loop.time()
+                            if (
+                                tool_calls
+                                or len(content_parts) - flushed >= TEXT_FLUSH_COUNT
+                                or now >= next_flush
+                            ):
+                                yield sse.text_delta("".join(content_parts[flushed:]))
+                                flushed = len(content_parts)
+                                next_flush = now + self._text_flush_interval
+
+                        # Accumulate tool-call fragments
+                        if tool_calls:
+                            for tc in tool_calls:
+                                idx = tc["index"]
+                                tc_id = tc.get("id")
+                                if idx >= len(tool_calls_acc):
+                                    tool_calls_acc.extend(
+                                        [None] * (idx + 1 - len(tool_calls_acc))
+                                    )
+                                acc = tool_calls_acc[idx]
+                                if acc is None:
+                                    acc = tool_calls_acc[idx] = {
+                                        "id": tc_id or "",
+                                        "name": "",
+                                        "arguments": [],
+                                    }
+                                if tc_id:
+                                    acc["id"] = tc_id
+                                fn = tc.get("function")
+                                if fn:
+                                    if fn.get("name"):
+                                        acc["name"] = fn["name"]
+                                    if fn.get("arguments"):
+                                        acc["arguments"].append(fn["arguments"])
+
+                        if finish_reason is not None:
+                            turn_finish = finish_reason
+                            break
+
+                except Exception as e:
+                    logger.error("Stream processing error: %s", e)
+                    stream_error = e
+                else:
+                    stream_error = None
+                finally:
+                    if next_chunk is not None:
+                        next_chunk.cancel()
+
+                # Hand the connection back to the pool before any further
+                # client-paced yields
+                await stack.aclose()
+
+                if flushed < len(content_parts):
+                    yield sse.text_delta("".join(content_parts[flushed:]))
+                if stream_error is not None:
+                    yield sse.error(f"Stream error: {stream_error}")
+                    yield sse.done()
+                    return
+
+            # Only a tool_calls finish asks for another LLM turn
+            if turn_finish != "tool_calls":
+                break
 
+            # ── LLM finished with tool calls ────────────────────
             try:
-                async for chunk in stream:
-                    if not chunk.choices:
+                # Build ONE assistant message with all tool_calls
+                assistant_tool_calls = []
+                calls = []
+                for tc_info in tool_calls_acc:
+                    if tc_info is None:  # index never streamed
                         continue
-                    choice = chunk.choices[0]
-                    delta = choice.delta
-                    finish_reason = choice.finish_reason
-                    if delta is None:
-                        continue
-
-                    # Text delta
-                    if delta.content:
-                        assistant_content += delta.content
-                        yield sse.text_delta(delta.content)
-
-                    # Accumulate tool-call fragments
-                    if delta.tool_calls:
-                        has_tool_calls = True
-                        for tc in delta.tool_calls:
-                            idx = tc.index
-                            if idx not in tool_calls_acc:
-                                tool_calls_acc[idx] = {
-                                    "id": tc.id or "",
-                                    "name": "",
-                                    "arguments": "",
-                                }
-                            if tc.id:
-                                tool_calls_acc[idx]["id"] = tc.id
-                            if tc.function:
-                                if tc.function.name:
-                                    tool_calls_acc[idx]["name"] = tc.function.name
-                                if tc.function.arguments:
-                                    tool_calls_acc[idx]["arguments"] += (
-                                        tc.function.arguments
-                                    )
+                    arguments = "".join(tc_info["arguments"])
+                    assistant_tool_calls.append(
+                        {
+                            "id": tc_info["id"],
+                            "type": "function",
+                            "function": {
+                                "name": tc_info["name"],
+                                "arguments": arguments,
+                            },
+                        }
+                    )
+                    try:
+                        args = orjson.loads(arguments)
+                    except orjson.JSONDecodeError:
+                        args = {}
+                    calls.append((tc_info["id"], tc_info["name"], args))
+                full_messages.append(
+                    {
+                        "role": "assistant",
+                        "content": "".join(content_parts) or None,
+                        "tool_calls": assistant_tool_calls,
+                    }
+                )
 
-                    # ── LLM finished with tool calls ────────────
-                    if finish_reason == "tool_calls":
-                        # Build ONE assistant message with all tool_calls
-                        assistant_tool_calls = []
-                        for idx in sorted(tool_calls_acc.keys()):
-                            tc_info = tool_calls_acc[idx]
-                            assistant_tool_calls.append(
-                                {
-                                    "id": tc_info["id"],
-                                    "type": "function",
-                                    "function": {
-                                        "name": tc_info["name"],
-                                        "arguments": tc_info["arguments"],
-                                    },
-                                }
-                            )
-                        full_messages.append(
-                            {
-                                "role": "assistant",
-                                "content": assistant_content or None,
-                                "tool_calls": assistant_tool_calls,
-                            }
-                        )
+                # Announce every tool, then run them concurrently
+                for tool_call_id, tool_name, args in calls:
+                    yield sse.tool_start(tool_call_id, tool_name, args)
+                    yield sse.status("tool-executing", tool_name)
 
-                        # Execute each tool
-                        for idx in sorted(tool_calls_acc.keys()):
-                            tc_info = tool_calls_acc[idx]
-                            tool_name = tc_info["name"]
-                            try:
-                                args = json.loads(tc_info["arguments"])
-                            except json.JSONDecodeError:
-                                args = {}
-
-                            yield sse.tool_start(tc_info["id"], tool_name, args)
-                            yield sse.status("tool-executing", tool_name)
-
-                            try:
-                                result = await asyncio.wait_for(
-                                    self._execute_tool(tool_name, args),
-                                    timeout=STEP_TIMEOUT,
-                                )
-                            except asyncio.TimeoutError:
-                                yield sse.tool_end(
-                                    tc_info["id"],
-                                    error=f"Tool execution timed out after {STEP_TIMEOUT}s",
-                                )
-                                full_messages.append(
-                                    {
-                                        "role": "tool",
-                                        "tool_call_id": tc_info["id"],
-                                        "content": json.dumps({"error": f"Tool execution timed out after {STEP_TIMEOUT}s"}),
-                                    }
-                                )
-                                continue
-
-                            # Check if tool result itself contains an error
-                            if "error" in result:
-                                yield sse.tool_end(
-                                    tc_info["id"], error=result["error"]
-                                )
-                            else:
-                                yield sse.tool_end(tc_info["id"], output=result)
-
-                            full_messages.append(
-                                {
-                                    "role": "tool",
-                                    "tool_call_id": tc_info["id"],
-                                    "content": json.dumps(result),
-                                }
-                            )
-
-                        assistant_content = ""
-                        break  # loop for next LLM turn
+                results = await asyncio.gather(
+                    *(
+                        self._execute_tool_limited(tool_name, args, code_cache)
+                        for _, tool_name, args in calls
+                    ),
+                    return_exceptions=True,
+                )
 
-                    # ── LLM finished normally ───────────────────
-                    if finish_reason == "stop":
-                        break
+                for (tool_call_id, tool_name, _), result in zip(calls, results):
+                    # One failing tool must not sink its siblings' results
+                    if isinstance(result, BaseException):
+                        logger.error("Tool %s failed: %s", tool_name, result)
+                        result = {"error": f"Tool execution failed: {result}"}
+
+                    # Serialize once: the same JSON feeds the SSE frame
+                    # and the tool message sent back to the LLM.
+                    result_json = sse.dumpb(result)
+
+                    # Check if tool result itself contains an error
+                    if "error" in result:
+                        yield sse.tool_end(tool_call_id, error=result["error"])
+                    else:
+                        yield sse.tool_end(tool_call_id, output_json=result_json)
+
+                    full_messages.append(
+                        {
+                            "role": "tool",
+                            "tool_call_id": tool_call_id,
+                            "content": result_json.decode(),
+                        }
+                    )
 
             except Exception as e:
                 logger.error("Stream processing error: %s", e)
@@ -482,8 +824,4 @@ class ChatService:
                 yield sse.done()
                 return
 
-            # No tool calls → we're done
-            if not has_tool_calls:
-                break
-
         yield sse.done()
@@ -1,11 +1,89 @@
 import logging
+import threading
+from collections.abc import Callable
 from datetime import datetime
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
 logger = logging.getLogger(__name__)
 
+# Low-cardinality meter columns stored as categoricals (compared by code)
+_METER_CATEGORY_COLUMNS = ("utility", "readingunits")
+
+
+def _compact_meter_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """Narrow meter columns: int32 building codes, categorical labels."""
+    dtypes = {"simscode": "int32"}
+    for col in _METER_CATEGORY_COLUMNS:
+        if col in df.columns:
+            dtypes[col] = "category"
+    return df.astype(dtypes)
+
+
+def _concat_meter_rows(base: pd.DataFrame, rows: pd.DataFrame) -> pd.DataFrame:
+    """Append compacted ``rows`` to ``base`` without leaving categorical dtype.
+
+    Both sides get the same categories (existing ones first, so ``base``'s
+    codes stay valid); otherwise concat would decode the whole table to
+    strings and it would have to be re-encoded.
+    """
+    if base.empty:
+        return rows
+    for col in _METER_CATEGORY_COLUMNS:
+        if col in base.columns and col in rows.columns:
+            existing = base[col].cat.categories
+            categories = existing.append(rows[col].cat.categories.difference(existing))
+            if len(categories) != len(existing):
+                base = base.assign(**{col: base[col].cat.set_categories(categories)})
+            rows[col] = rows[col].cat.set_categories(categories)
+    return pd.concat([base, rows], ignore_index=True)
+
+
+def _time_range(times: np.ndarray, start: datetime | None, end: datetime | None) -> slice:
+    """Slice of time-sorted ``times`` within ``[start, end]`` (naive, inclusive).
+
+    NaT readings sort last. They are kept only when the range is unbounded,
+    matching the comparison masks this replaces (NaT never compares true).
+    """
+    lo, hi = 0, len(times)
+    if start:
+        start = pd.Timestamp(start).tz_localize(None) if start.tzinfo else pd.Timestamp(start)
+        lo = times.searchsorted(start.to_datetime64().astype(times.dtype), side="left")
+        hi = times.searchsorted(np.datetime64("NaT"), side="left")
+    if end:
+        end = pd.Timestamp(end).tz_localize(None) if end.tzinfo else pd.Timestamp(end)
+        hi = times.searchsorted(end.to_datetime64().astype(times.dtype), side="right")
+    return slice(lo, hi)
+
+
+def _bucket_sums(times: np.ndarray, values: np.ndarray, unit: str) -> pd.DataFrame:
+    """Sum/mean/count of time-sorted readings per ``unit`` ("h" or "D") bucket.
+
+    Sorted input puts each bucket in one contiguous run, so the reductions
+    are single ``np.add.reduceat`` passes over the run starts. Like
+    ``groupby().agg``, NaT readings are dropped and NaN values are skipped.
+    """
+    valid = times.searchsorted(np.datetime64("NaT"), side="left")  # NaT sorts last
+    if valid == 0:
+        return pd.DataFrame(columns=["timestamp", "readingvalue_sum", "readingvalue_mean", "count"])
+    buckets = times[:valid].astype(f"datetime64[{unit}]")
+    values = values[:valid]
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    present = ~np.isnan(values)
+    sums = np.add.reduceat(np.where(present, values, 0.0), starts)
+    counts = np.add.reduceat(present.astype(np.int64), starts)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = sums / counts
+    means[counts == 0] = np.nan
+    return pd.DataFrame({
+        "timestamp": buckets[starts].astype(times.dtype),
+        "readingvalue_sum": sums,
+        "readingvalue_mean": means,
+        "count": counts,
+    })
+
 
 class DataService:
     def __init__(self, data_dir: Path):
@@ -14,8 +92,34 @@ class DataService:
         self._meter_data: pd.DataFrame = pd.DataFrame()
         self._weather: pd.DataFrame = pd.DataFrame()
         self._buildings_with_meters: set[int] = set()
+        # simscode -> sorted utilities; rebuilt lazily after meter appends
+        self._building_utilities: dict[int, list[str]] | None = None
+        # (simscode, utility) -> (row positions, readingtimes, readingvalues),
+        # time-sorted; rebuilt lazily after meter appends
+        self._meter_index: dict[tuple[int, str], tuple[np.ndarray, np.ndarray, np.ndarray]] | None = None
+        # (simscode, utility, resolution) -> full-range bucket aggregates
+        self._aggregates: dict[tuple[int, str, str], pd.DataFrame] = {}
+        # get_all_buildings() result; rebuilt lazily after appends
+        self._all_buildings: list[dict] | None = None
+        # buildingnumber -> metadata row; rebuilt lazily after building appends
+        self._building_index: dict[int, dict] | None = None
+        # (utility, scoring method) -> (encoded /buildings body, buildings to
+        # prewarm), for the score version in _buildings_payload_scores
+        self._buildings_payload: dict[tuple[str, str], tuple[bytes, list[int]]] = {}
+        self._buildings_payload_scores: int | None = None
+        self._version = 0
+        # The lazy caches above are built outside this lock, often in worker
+        # threads. A result is stored only if _version is unchanged since the
+        # build began; appends swap data, bump _version and reset the caches
+        # under the lock, so a build racing an append is never stored.
+        self._cache_lock = threading.Lock()
         self._load()
 
+    @property
+    def version(self) -> int:
+        """Bumped on every append; used to validate HTTP caches."""
+        return self._version
+
     def _load(self):
         logger.info("Loading data from %s", self._data_dir)
 
@@ -37,7 +141,7 @@ class DataService:
             self._meter_data = pd.concat(dfs, ignore_index=True)
             print(f"Columns in meter data: {self._meter_data.columns.tolist()}")
             self._meter_data = self._meter_data.dropna(subset=["simscode"])
-            self._meter_data["simscode"] = self._meter_data["simscode"].astype(int)
+            self._meter_data = _compact_meter_dtypes(self._meter_data)
             self._meter_data["readingtime"] = pd.to_datetime(
                 self._meter_data["readingtime"], errors="coerce"
             )
@@ -65,37 +169,91 @@ class DataService:
         )
 
     def get_all_buildings(self) -> list[dict]:
+        """Metered, geolocated buildings; shared between callers, do not mutate."""
+        buildings = self._all_buildings
+        if buildings is None:
+            version = self._version
+            buildings = self._build_all_buildings()
+            with self._cache_lock:
+                if self._version == version:
+                    self._all_buildings = buildings
+        return buildings
+
+    def get_buildings_payload(
+        self,
+        utility: str,
+        scoring_method: str,
+        scores_version: int,
+        build: Callable[[], tuple[bytes, list[int]]],
+    ) -> tuple[bytes, list[int]]:
+        """Encoded ``/buildings`` body, built by ``build()`` once per version.
+
+        Entries are reset on every append and whenever ``scores_version``
+        moves on. Callers pass only scored utilities and resolved methods, so
+        the cache stays bounded by what the scoring service knows.
+        """
+        key = (utility, scoring_method)
+        with self._cache_lock:
+            entry = None
+            if self._buildings_payload_scores == scores_version:
+                entry = self._buildings_payload.get(key)
+        if entry is None:
+            version = self._version
+            entry = build()
+            with self._cache_lock:
+                if self._version == version:
+                    if self._buildings_payload_scores != scores_version:
+                        self._buildings_payload = {}
+                        self._buildings_payload_scores = scores_version
+                    self._buildings_payload[key] = entry
+        return entry
+
+    def _build_all_buildings(self) -> list[dict]:
         mask = self._buildings["buildingnumber"].isin(self._buildings_with_meters)
         mask &= self._buildings["latitude"].notna()
         mask &= self._buildings["longitude"].notna()
         df = self._buildings[mask]
 
-        result = []
-        for _, row in df.iterrows():
-            result.append(
-                {
-                    "buildingNumber": int(row["buildingnumber"]),
-                    "buildingName": str(row.get("buildingname", "")),
-                    "campusName": str(row.get("campusname", "")),
-                    "latitude": float(row["latitude"]),
-                    "longitude": float(row["longitude"]),
-                    "grossArea": float(row.get("grossarea", 0)),
-                    "constructionDate": (
-                        row["constructiondate"].isoformat()
-                        if pd.notna(row.get("constructiondate"))
-                        else None
-                    ),
-                    "floorsAboveGround": int(row.get("floorsaboveground", 0)),
-                    "floorsBelowGround": int(row.get("floorsbelowground", 0)),
-                }
-            )
-        return result
+        def column(name: str, default) -> pd.Series:
+            if name in df.columns:
+                return df[name]
+            return pd.Series(default, index=df.index)
+
+        dates = pd.to_datetime(column("constructiondate", pd.NaT), errors="coerce")
+        columns = {
+            "buildingNumber": df["buildingnumber"].astype(int).tolist(),
+            "buildingName": [str(v) for v in column("buildingname", "").tolist()],
+            "campusName": [str(v) for v in column("campusname", "").tolist()],
+            "latitude": df["latitude"].astype(float).tolist(),
+            "longitude": df["longitude"].astype(float).tolist(),
+            "grossArea": column("grossarea", 0).astype(float).tolist(),
+            "constructionDate": (
+                dates.dt.strftime("%Y-%m-%dT%H:%M:%S")
+                .astype(object)
+                .where(dates.notna(), None)
+                .tolist()
+            ),
+            "floorsAboveGround": column("floorsaboveground", 0).astype(int).tolist(),
+            "floorsBelowGround": column("floorsbelowground", 0).astype(int).tolist(),
+        }
+        names = list(columns)
+        return [dict(zip(names, row)) for row in zip(*columns.values())]
 
     def get_building(self, building_number: int) -> dict | None:
-        df = self._buildings[self._buildings["buildingnumber"] == building_number]
-        if df.empty:
+        index = self._building_index
+        if index is None:
+            version = self._version
+            index = {}
+            for row in self._buildings.to_dict("records"):
+                if pd.notna(row["buildingnumber"]):
+                    # First row wins, as the mask lookup's iloc[0] did
+                    index.setdefault(int(row["buildingnumber"]), row)
+            with self._cache_lock:
+                if self._version == version:
+                    self._building_index = index
+        row = index.get(building_number)
+        if row is None:
             return None
-        row = df.iloc[0]
         return {
             "buildingNumber": int(row["buildingnumber"]),
             "buildingName": str(row.get("buildingname", "")),
@@ -118,8 +276,25 @@ class DataService:
         }
 
     def get_building_utilities(self, building_number: int) -> list[str]:
-        mask = self._meter_data["simscode"] == building_number
-        return sorted(self._meter_data.loc[mask, "utility"].unique().tolist())
+        return list(self.get_all_building_utilities().get(building_number, []))
+
+    def get_all_building_utilities(self) -> dict[int, list[str]]:
+        """Map every metered building to its sorted utility list (one groupby)."""
+        utilities = self._building_utilities
+        if utilities is None:
+            version = self._version
+            meter_data = self._meter_data
+            if meter_data.empty:
+                utilities = {}
+            else:
+                grouped = meter_data.groupby("simscode")["utility"].unique()
+                utilities = {
+                    int(bn): sorted(utils.tolist()) for bn, utils in grouped.items()
+                }
+            with self._cache_lock:
+                if self._version == version:
+                    self._building_utilities = utilities
+        return utilities
 
     def get_meter_data(
         self,
@@ -128,16 +303,63 @@ class DataService:
         start: datetime | None = None,
         end: datetime | None = None,
     ) -> pd.DataFrame:
-        mask = (self._meter_data["simscode"] == building_number) & (
-            self._meter_data["utility"] == utility
-        )
-        if start:
-            start = pd.Timestamp(start).tz_localize(None) if start.tzinfo else start
-            mask &= self._meter_data["readingtime"] >= start
-        if end:
-            end = pd.Timestamp(end).tz_localize(None) if end.tzinfo else end
-            mask &= self._meter_data["readingtime"] <= end
-        return self._meter_data[mask].copy()
+        entry = self._get_meter_index().get((building_number, utility))
+        if entry is None:
+            return self._meter_data.iloc[:0].copy()
+        positions, times, _ = entry
+        # iloc with a position array returns a fresh frame, safe to mutate
+        return self._meter_data.iloc[positions[_time_range(times, start, end)]]
+
+    def get_meter_series(
+        self,
+        building_number: int,
+        utility: str,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """``(readingtime, readingvalue)`` arrays for one meter, time-sorted.
+
+        The arrays are views into the shared index and must not be mutated.
+        """
+        entry = self._get_meter_index().get((building_number, utility))
+        if entry is None:
+            return np.array([], dtype="datetime64[ns]"), np.array([], dtype=np.float64)
+        _, times, values = entry
+        window = _time_range(times, start, end)
+        return times[window], values[window]
+
+    def _get_meter_index(
+        self,
+    ) -> dict[tuple[int, str], tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """Row positions, readingtimes and readingvalues per (building, utility).
+
+        All three are sorted by readingtime, so lookups take a building's
+        rows and bisect the time range instead of masking the whole meter
+        table on every call. NaT readings sort last; ``_time_range`` drops
+        them from any bounded range, as the masks did.
+        """
+        index = self._meter_index
+        if index is None:
+            version = self._version
+            meter_data = self._meter_data
+            index = {}
+            if not meter_data.empty:
+                times = meter_data["readingtime"].to_numpy()
+                values = meter_data["readingvalue"].to_numpy(dtype=np.float64)
+                groups = meter_data.groupby(
+                    ["simscode", "utility"], sort=False, observed=True
+                ).indices
+                for (bn, utility), positions in groups.items():
+                    positions = positions[np.argsort(times[positions], kind="stable")]
+                    index[(int(bn), utility)] = (
+                        positions,
+                        times[positions],
+                        values[positions],
+                    )
+            with self._cache_lock:
+                if self._version == version:
+                    self._meter_index = index
+        return index
 
     def get_aggregated_meter_data(
         self,
@@ -147,69 +369,120 @@ class DataService:
         start: datetime | None = None,
         end: datetime | None = None,
     ) -> pd.DataFrame:
+        """Bucket one building's readings by resolution.
+
+        Full-range hourly/daily results for metered (building, utility)
+        pairs are memoized until the next meter append and shared between
+        callers, so they must not be mutated. Bounded ranges are aggregated
+        per call, since their edge buckets hold only part of an hour or day;
+        other resolutions and unknown pairs are never cached, which keeps the
+        memo bounded by the meter index.
+        """
+        if (
+            start
+            or end
+            or resolution not in ("hourly", "daily")
+            or (building_number, utility) not in self._get_meter_index()
+        ):
+            return self._aggregate_meter_data(
+                building_number, utility, resolution, start, end
+            )
+        key = (building_number, utility, resolution)
+        agg = self._aggregates.get(key)
+        if agg is None:
+            version = self._version
+            agg = self._aggregate_meter_data(building_number, utility, resolution)
+            with self._cache_lock:
+                if self._version == version:
+                    self._aggregates[key] = agg
+        return agg
+
+    def _aggregate_meter_data(
+        self,
+        building_number: int,
+        utility: str,
+        resolution: str,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> pd.DataFrame:
+        if resolution != "15min":
+            times, values = self.get_meter_series(building_number, utility, start, end)
+            return _bucket_sums(times, values, "h" if resolution == "hourly" else "D")
+
         df = self.get_meter_data(building_number, utility, start, end)
         if df.empty:
             return pd.DataFrame(columns=["timestamp", "readingvalue_sum", "readingvalue_mean", "count"])
 
-        if resolution == "15min":
-            result = df[["readingtime", "readingvalue"]].copy()
-            result = result.rename(columns={"readingtime": "timestamp"})
-            result["readingvalue_sum"] = result["readingvalue"]
-            result["readingvalue_mean"] = result["readingvalue"]
-            result["count"] = 1
-            return result
-
-        if resolution == "hourly":
-            df["bucket"] = df["readingtime"].dt.floor("h")
-        else:  # daily
-            df["bucket"] = df["readingtime"].dt.floor("D")
-
-        agg = (
-            df.groupby("bucket")
-            .agg(
-                readingvalue_sum=("readingvalue", "sum"),
-                readingvalue_mean=("readingvalue", "mean"),
-                count=("readingvalue", "count"),
-            )
-            .reset_index()
-            .rename(columns={"bucket": "timestamp"})
-        )
-        return agg
+        result = df[["readingtime", "readingvalue"]].copy()
+        result = result.rename(columns={"readingtime": "timestamp"})
+        result["readingvalue_sum"] = result["readingvalue"]
+        result["readingvalue_mean"] = result["readingvalue"]
+        result["count"] = 1
+        return result
 
     def get_weather(
         self, start: datetime | None = None, end: datetime | None = None
     ) -> pd.DataFrame:
-        df = self._weather.copy()
+        """Weather rows within ``[start, end]``.
+
+        Without bounds this is the stored frame itself, shared between
+        callers, so it must not be mutated.
+        """
+        df = self._weather
+        if not (start or end):
+            return df
+        mask = pd.Series(True, index=df.index)
         if start:
             start = pd.Timestamp(start).tz_localize(None) if start.tzinfo else start
-            df = df[df["date"] >= start]
+            mask &= df["date"] >= start
         if end:
             end = pd.Timestamp(end).tz_localize(None) if end.tzinfo else end
-            df = df[df["date"] <= end]
-        return df
+            mask &= df["date"] <= end
+        return df[mask]
 
     def get_all_meter_data_for_utility(self, utility: str) -> pd.DataFrame:
-        return self._meter_data[self._meter_data["utility"] == utility].copy()
+        # Boolean indexing already returns a new frame
+        return self._meter_data[self._meter_data["utility"] == utility]
 
     def append_meter_data(self, df: pd.DataFrame) -> int:
         df = df.copy()
         df["simscode"] = df["simscode"].astype(int)
         if "readingtime" in df.columns:
             df["readingtime"] = pd.to_datetime(df["readingtime"], errors="coerce")
-        self._meter_data = pd.concat([self._meter_data, df], ignore_index=True)
-        self._buildings_with_meters.update(df["simscode"].unique())
+        meter_data = _concat_meter_rows(self._meter_data, _compact_meter_dtypes(df))
+        # A new set, not update(): readers may be iterating the current one
+        with_meters = self._buildings_with_meters | set(df["simscode"].unique())
+        with self._cache_lock:
+            self._meter_data = meter_data
+            self._buildings_with_meters = with_meters
+            self._version += 1
+            self._building_utilities = None
+            self._meter_index = None
+            self._aggregates = {}
+            self._all_buildings = None
+            self._buildings_payload = {}
         return len(df)
 
     def append_weather_data(self, df: pd.DataFrame) -> int:
         df = df.copy()
         if "date" in df.columns:
             df["date"] = pd.to_datetime(df["date"], errors="coerce")
-        self._weather = pd.concat([self._weather, df], ignore_index=True)
+        weather = pd.concat([self._weather, df], ignore_index=True)
+        with self._cache_lock:
+            self._weather = weather
+            self._version += 1
+            self._buildings_payload = {}
         return len(df)
 
     def append_building_data(self, df: pd.DataFrame) -> int:
         df = df.copy()
         df = df.dropna(subset=["buildingnumber"])
         df["buildingnumber"] = df["buildingnumber"].astype(int)
-        self._buildings = pd.concat([self._buildings, df], ignore_index=True)
+        buildings = pd.concat([self._buildings, df], ignore_index=True)
+        with self._cache_lock:
+            self._buildings = buildings
+            self._version += 1
+            self._all_buildings = None
+            self._buildings_payload = {}
+            self._building_index = None
         return len(df)
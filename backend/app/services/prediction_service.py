@@ -1,9 +1,13 @@
 import logging
+import threading
+from collections import OrderedDict
 from pathlib import Path
 
 import numpy as np
+import orjson
+from numpy.lib.stride_tricks import sliding_window_view
 import pandas as pd
-from xgboost import XGBRegressor
+from xgboost import Booster
 
 from app.services.data_service import DataService
 from app.utils.feature_engineering import (
@@ -17,17 +21,70 @@ from app.utils.feature_engineering import (
 
 logger = logging.getLogger(__name__)
 
+PREDICTION_CACHE_SIZE = 64
 
-def _get_model_feature_names(model: XGBRegressor) -> list[str] | None:
+
+def _get_model_feature_names(model: Booster) -> list[str] | None:
     """Extract feature names stored in the XGBoost model."""
     try:
-        names = model.get_booster().feature_names
+        names = model.feature_names
         if names:
             return names
     except Exception:
         pass
     return None
 
+
+def residual_metrics(residuals: pd.Series | np.ndarray) -> tuple[float, float, float]:
+    """Return ``(mae, rmse, mean_residual)`` in one pass over the residuals.
+
+    NaN residuals (e.g. LSTM warm-up rows) are skipped, as pandas' mean() does.
+    """
+    r = np.asarray(residuals, dtype=np.float64)
+    nan = np.isnan(r)
+    if nan.any():
+        r = r[~nan]
+    n = max(r.size, 1)
+    mae = float(np.abs(r).sum() / n)
+    rmse = float(np.sqrt(np.dot(r, r) / n))
+    mean_residual = float(r.sum() / n)
+    return mae, rmse, mean_residual
+
+
+def metrics_payload(mae: float, rmse: float, mean_residual: float) -> dict[str, float]:
+    """Residual metrics rounded for API output; ``mae`` doubles as anomaly score."""
+    return {
+        "rmse": round(rmse, 6),
+        "mae": round(mae, 6),
+        "meanResidual": round(mean_residual, 6),
+    }
+
+
+def tail_columns(df: pd.DataFrame, n: int) -> dict[str, np.ndarray]:
+    """Last ``n`` prediction rows as column arrays (readingtime as str)."""
+    start = max(len(df) - n, 0)
+    return {
+        "readingtime": df["readingtime"].iloc[start:].dt.strftime("%Y-%m-%d %H:%M:%S").to_numpy(),
+        "energy_per_sqft": df["energy_per_sqft"].to_numpy()[start:],
+        "predicted": df["predicted"].to_numpy()[start:],
+        "residual": df["residual"].to_numpy()[start:],
+    }
+
+
+def records_from_columns(columns: dict[str, np.ndarray]) -> list[dict]:
+    """Turn equal-length column arrays into JSON-ready row dicts."""
+    names = list(columns)
+    return [
+        dict(zip(names, row))
+        for row in zip(*(col.tolist() for col in columns.values()))
+    ]
+
+
+def tail_records(df: pd.DataFrame, n: int) -> list[dict]:
+    """Last ``n`` prediction rows as JSON-ready dicts (readingtime as str)."""
+    return records_from_columns(tail_columns(df, n))
+
+
 class ModelNotAvailableError(Exception):
     pass
 
@@ -43,8 +100,14 @@ class InsufficientDataError(Exception):
 class PredictionService:
     def __init__(self, data_service: DataService, model_dir: Path):
         self._data_service = data_service
-        self._models: dict[str, XGBRegressor] = {}
+        self._models: dict[str, Booster | None] = {}
+        # Trees to score per utility: (0, best_iteration + 1) for models
+        # trained with early stopping, (0, 0) (all trees) otherwise
+        self._iteration_ranges: dict[str, tuple[int, int]] = {}
         self._lstm_gas = None  # (model, scaler_stats, device) or None
+        # (building_number, utility, overrides_json, data_version) -> result
+        self._cache: OrderedDict[tuple, tuple[pd.DataFrame, tuple]] = OrderedDict()
+        self._cache_lock = threading.Lock()
         self._load_models(model_dir)
 
     def _load_models(self, model_dir: Path):
@@ -59,9 +122,14 @@ class PredictionService:
         for filename, utility in model_map.items():
             path = model_dir / filename
             if path.exists():
-                model = XGBRegressor()
-                model.load_model(str(path))
-                self._models[utility] = model
+                # Raw Booster: predict() on the sklearn wrapper only adds
+                # per-call checks before reaching the same inplace_predict
+                booster = Booster(model_file=str(path))
+                self._models[utility] = booster
+                best = booster.attr("best_iteration")
+                self._iteration_ranges[utility] = (
+                    (0, int(best) + 1) if best is not None else (0, 0)
+                )
                 logger.info("Loaded XGBoost model for %s from %s", utility, path)
 
         # Load LSTM gas model
@@ -80,8 +148,13 @@ class PredictionService:
 
         logger.info("Models available for: %s", list(self._models.keys()))
 
-    def _predict(self, model: XGBRegressor, X: np.ndarray) -> np.ndarray:
-        return model.predict(X)
+    def _predict(self, utility: str, X: np.ndarray) -> np.ndarray:
+        # XGBoost works in float32; cast once into a contiguous block. Stop at
+        # the saved best iteration, as XGBRegressor.predict does.
+        return self._models[utility].inplace_predict(
+            np.ascontiguousarray(X, dtype=np.float32),
+            iteration_range=self._iteration_ranges[utility],
+        )
 
     def _predict_gas_lstm(
         self,
@@ -104,48 +177,56 @@ class PredictionService:
             if col in df.columns:
                 df[col] = df[col].fillna(0.0)
 
-        # Build sliding windows per building
-        windows_temporal = []
-        windows_static = []
-        index_keys = []  # (simscode, readingtime) for mapping back
-
-        for code, grp in df.groupby("simscode"):
-            grp = grp.sort_values("readingtime")
-            temporal = grp[temporal_cols].values.astype(np.float32)
-            static = grp[static_cols].iloc[0].values.astype(np.float32)
-            times = grp["readingtime"].values
-
-            n = len(grp)
-            for start in range(0, n - seq_length + 1):
-                end = start + seq_length
-                windows_temporal.append(temporal[start:end])
-                windows_static.append(static)
-                index_keys.append((code, times[end - 1]))
-
-        if not windows_temporal:
+        # Sort once so each building is one contiguous run, then write every
+        # building's windows straight into preallocated arrays
+        ordered = df.sort_values(["simscode", "readingtime"])
+        codes = ordered["simscode"].to_numpy()
+        temporal = ordered[temporal_cols].to_numpy(dtype=np.float32)
+        static = ordered[static_cols].to_numpy(dtype=np.float32)
+        times = ordered["readingtime"].to_numpy()
+
+        # Normalize with the training scaler stats per row, in place, before
+        # windowing: each row lands in up to seq_length windows
+        temporal -= np.array(scaler_stats["temporal_mean"], dtype=np.float32)
+        temporal /= np.array(scaler_stats["temporal_std"], dtype=np.float32)
+        static -= np.array(scaler_stats["static_mean"], dtype=np.float32)
+        static /= np.array(scaler_stats["static_std"], dtype=np.float32)
+
+        building_codes, starts = np.unique(codes, return_index=True)
+        ends = np.r_[starts[1:], len(codes)]
+        counts = np.maximum(ends - starts - seq_length + 1, 0)
+        n_windows = int(counts.sum())
+
+        if n_windows == 0:
             df["predicted"] = np.nan
             df["residual"] = np.nan
             return df
 
-        X_temporal = np.stack(windows_temporal)  # (N, seq_length, n_temporal)
-        X_static = np.stack(windows_static)      # (N, n_static)
-
-        # Normalize using training scaler stats
-        t_mean = np.array(scaler_stats["temporal_mean"], dtype=np.float32)
-        t_std = np.array(scaler_stats["temporal_std"], dtype=np.float32)
-        s_mean = np.array(scaler_stats["static_mean"], dtype=np.float32)
-        s_std = np.array(scaler_stats["static_std"], dtype=np.float32)
-
-        X_temporal = (X_temporal - t_mean) / t_std
-        X_static = (X_static - s_mean) / s_std
+        X_temporal = np.empty((n_windows, seq_length, len(temporal_cols)), dtype=np.float32)
+        X_static = np.empty((n_windows, len(static_cols)), dtype=np.float32)
+        # (simscode, readingtime) of each window's last step, for mapping back
+        key_codes = np.repeat(building_codes, counts)
+        key_times = np.empty(n_windows, dtype=times.dtype)
+
+        pos = 0
+        for start, end, count in zip(starts, ends, counts):
+            if count == 0:
+                continue
+            # (count, n_temporal, seq_length) view -> time axis second
+            X_temporal[pos:pos + count] = sliding_window_view(
+                temporal[start:end], seq_length, axis=0
+            ).transpose(0, 2, 1)
+            X_static[pos:pos + count] = static[start]
+            key_times[pos:pos + count] = times[start + seq_length - 1:end]
+            pos += count
 
         # Run inference
         preds = lstm_predict(model, X_temporal, X_static, scaler_stats, device)
 
         # Map predictions back to DataFrame
         pred_df = pd.DataFrame({
-            "simscode": [k[0] for k in index_keys],
-            "readingtime": [k[1] for k in index_keys],
+            "simscode": key_codes,
+            "readingtime": key_times,
             "predicted": preds,
         })
         # Keep last prediction for each (simscode, readingtime)
@@ -196,7 +277,7 @@ class PredictionService:
                 df[col] = df[col].fillna(0)
 
         X = df[feature_cols].values
-        df["predicted"] = self._predict(model, X)
+        df["predicted"] = self._predict(utility, X)
         df["residual"] = df["energy_per_sqft"] - df["predicted"]
 
         return df
@@ -206,6 +287,69 @@ class PredictionService:
         building_number: int,
         utility: str,
         weather_overrides: dict | None = None,
+    ) -> pd.DataFrame:
+        """Predict one building's series.
+
+        Results are cached per (building, utility, overrides) until the data
+        changes; the returned DataFrame is shared and must not be mutated.
+        """
+        return self._cached_prediction(building_number, utility, weather_overrides)[0]
+
+    def predict_building_stats(
+        self,
+        building_number: int,
+        utility: str,
+        weather_overrides: dict | None = None,
+        tail: int = 10,
+    ) -> dict:
+        """Predict one building and return only what summaries need.
+
+        Returns ``{"metrics": (mae, rmse, mean_residual), "tail":
+        tail_columns(...)}``. The metrics are reduced once when the prediction
+        is cached, so repeat calls only slice the tail.
+        """
+        df, metrics = self._cached_prediction(
+            building_number, utility, weather_overrides
+        )
+        return {"metrics": metrics, "tail": tail_columns(df, tail)}
+
+    def _cached_prediction(
+        self,
+        building_number: int,
+        utility: str,
+        weather_overrides: dict | None,
+    ) -> tuple[pd.DataFrame, tuple[float, float, float]]:
+        overrides_key = orjson.dumps(
+            weather_overrides or {}, option=orjson.OPT_SORT_KEYS, default=str
+        )
+        key = (building_number, utility, overrides_key, self._data_service.version)
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                self._cache.move_to_end(key)
+                return entry
+
+        df = self._predict_building(building_number, utility, weather_overrides)
+        entry = (df, residual_metrics(df["residual"].to_numpy(dtype=np.float64)))
+        with self._cache_lock:
+            self._cache[key] = entry
+            while len(self._cache) > PREDICTION_CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return entry
+
+    def prewarm(self, building_numbers: list[int], utility: str):
+        """Populate the prediction cache for buildings likely to be opened next."""
+        for bn in building_numbers:
+            try:
+                self.predict_building(bn, utility)
+            except Exception as e:
+                logger.debug("Prewarm skipped building %s (%s): %s", bn, utility, e)
+
+    def _predict_building(
+        self,
+        building_number: int,
+        utility: str,
+        weather_overrides: dict | None = None,
     ) -> pd.DataFrame:
         if utility not in self._models:
             raise ModelNotAvailableError(f"No model for {utility}")
@@ -247,7 +391,7 @@ class PredictionService:
                 df[col] = df[col].fillna(0)
 
         X = df[feature_cols].values
-        df["predicted"] = self._predict(model, X)
+        df["predicted"] = self._predict(utility, X)
         df["residual"] = df["energy_per_sqft"] - df["predicted"]
 
         return df
@@ -32,6 +32,25 @@ class BuildingScore:
 
 DEFAULT_THRESHOLDS = {"caution": 0.5, "warning": 0.7, "anomaly": 0.9}
 
+UTILITY_UNITS = {
+    "ELECTRICITY": "kWh", "GAS": "varies", "HEAT": "varies",
+    "STEAM": "kg", "COOLING": "ton-hours", "COOLING_POWER": "tons",
+    "STEAMRATE": "varies", "OIL28SEC": "varies",
+}
+
+SCORING_METHODS = (
+    "multi_signal_weighted",
+    "investment_impact",
+    "zscore_portfolio",
+    "multi_signal_percentile",
+)
+DEFAULT_SCORING_METHOD = "multi_signal_weighted"
+
+
+def resolve_scoring_method(name: str) -> str:
+    """Return ``name`` if it is a known scoring method, else the default."""
+    return name if name in SCORING_METHODS else DEFAULT_SCORING_METHOD
+
 
 def _status_from_score(score: float, thresholds: dict | None = None) -> str:
     t = thresholds or DEFAULT_THRESHOLDS
@@ -52,9 +71,10 @@ def _percentile_ranks(values: np.ndarray) -> np.ndarray:
     n = len(values)
     if n <= 1:
         return np.zeros_like(values)
-    # argsort-based ranking (average method)
-    order = np.argsort(np.argsort(values)).astype(float)
-    return order / max(n - 1, 1)
+    # Ordinal ranks: one argsort, then scatter positions back (ties by index)
+    ranks = np.empty(n, dtype=float)
+    ranks[np.argsort(values, kind="stable")] = np.arange(n)
+    return ranks / (n - 1)
 
 
 SIGNAL_WEIGHTS = {
@@ -104,92 +124,156 @@ class ScoringService:
         self._thresholds: dict = dict(DEFAULT_THRESHOLDS)
         # utility -> buildingNumber -> metrics dict
         self._metrics: dict[str, dict[str, dict]] = {}
+        # utility -> data_service.version the metrics were computed from
+        self._metrics_version: dict[str, int] = {}
         self._available_utilities: list[str] = []
+        # (utility, resolved scoring_method) -> scores; valid for the current
+        # version. Only scored utilities and SCORING_METHODS become keys, so
+        # the cache holds at most len(utilities) * len(SCORING_METHODS) lists.
+        self._score_cache: dict[tuple[str, str], list[BuildingScore]] = {}
+        self._version = 0
         self._compute_all()
 
+    @property
+    def version(self) -> int:
+        """Bumped whenever metrics or thresholds change."""
+        return self._version
+
+    def _invalidate(self):
+        self._version += 1
+        self._score_cache.clear()
+
     def get_thresholds(self) -> dict:
         return dict(self._thresholds)
 
     def update_thresholds(self, thresholds: dict):
         self._thresholds = dict(thresholds)
+        self._invalidate()
 
     def _compute_all(self):
         for utility in self._prediction_service.get_available_utilities():
             try:
-                pred_df = self._prediction_service.predict_all(utility)
-                self._compute_metrics(utility, pred_df)
+                self._compute_utility(utility)
                 self._available_utilities.append(utility)
                 logger.info("Scores computed for %s: %d buildings", utility, len(self._metrics.get(utility, {})))
             except Exception as e:
+                self._metrics.pop(utility, None)
+                self._metrics_version.pop(utility, None)
                 logger.error("Failed to compute scores for %s: %s", utility, e)
 
-    def _compute_metrics(self, utility: str, pred_df: pd.DataFrame):
-        self._metrics[utility] = {}
-
-        for bn, group in pred_df.groupby("simscode"):
-            residuals = group["residual"]
-            latest = group.sort_values("readingtime").iloc[-1]
+    def _compute_utility(self, utility: str):
+        """Run predict_all for a utility unless its metrics are already current.
 
-            # Basic metrics
-            mean_residual = float(residuals.mean())
-            mean_abs_residual = float(residuals.abs().mean())
-            std_residual = float(residuals.std()) if len(residuals) > 1 else 0.0
-            positive_ratio = float((residuals > 0).mean())
+        Metrics are reused while the data version they were computed from is
+        unchanged, which saves a full model pass per utility on recompute.
+        """
+        version = self._data_service.version
+        if utility in self._metrics and self._metrics_version.get(utility) == version:
+            return
+        pred_df = self._prediction_service.predict_all(utility)
+        self._compute_metrics(utility, pred_df)
+        self._metrics_version[utility] = version
 
+    def _compute_metrics(self, utility: str, pred_df: pd.DataFrame):
+        self._invalidate()
+        self._metrics[utility] = {}
+        if pred_df.empty:
+            return
+
+        df = pred_df.assign(
+            abs_residual=pred_df["residual"].abs(),
+            positive=pred_df["residual"] > 0,
+            # Excess ratio: actual / predicted - 1 (zero predictions ignored)
+            ratio=pred_df["energy_per_sqft"] / pred_df["predicted"].replace(0, np.nan) - 1,
+        )
+        g = df.groupby("simscode")
+
+        # Basic metrics and excess ratio in one pass
+        stats = g.agg(
+            mean_residual=("residual", "mean"),
+            mean_abs_residual=("abs_residual", "mean"),
+            std_residual=("residual", "std"),
+            positive_ratio=("positive", "mean"),
+            excess_ratio=("ratio", "mean"),
+            n_observations=("residual", "size"),
+        )
+        bns = stats.index
+        stats.loc[stats["n_observations"] <= 1, "std_residual"] = 0.0
+        stats["excess_ratio"] = stats["excess_ratio"].fillna(0.0)
+
+        # Latest reading per building
+        latest = (
+            df.sort_values("readingtime", kind="stable")
+            .drop_duplicates("simscode", keep="last")
+            .set_index("simscode")
+            .reindex(bns)
+        )
+        stats["latest_actual"] = latest["energy_per_sqft"]
+        stats["latest_predicted"] = latest["predicted"]
+        stats["latest_diff"] = latest["energy_per_sqft"] - latest["predicted"]
+
+        # Consistency: fraction of days where daily mean residual > 0
+        daily_mean = df.groupby(["simscode", df["readingtime"].dt.floor("D")])["residual"].mean()
+        stats["consistency"] = (
+            (daily_mean > 0).groupby(level="simscode").mean().reindex(bns).fillna(0.0)
+        )
+
+        # Peak excess: 95th percentile of positive residuals
+        positive = df.loc[df["positive"]]
+        stats["peak_excess"] = (
+            positive.groupby("simscode")["residual"].quantile(0.95).reindex(bns).fillna(0.0)
+        )
+
+        # Weather sensitivity: correlation of |residual| with temperature
+        stats["weather_sensitivity"] = 0.0
+        if "temperature_2m" in df.columns:
+            valid = df.loc[df["temperature_2m"].notna() & df["abs_residual"].notna()]
+            vg = valid.groupby("simscode")
+            dx = valid["abs_residual"] - vg["abs_residual"].transform("mean")
+            dy = valid["temperature_2m"] - vg["temperature_2m"].transform("mean")
+            sums = pd.DataFrame(
+                {"xy": dx * dy, "xx": dx * dx, "yy": dy * dy, "simscode": valid["simscode"]}
+            ).groupby("simscode").sum()
+            with np.errstate(divide="ignore", invalid="ignore"):
+                corr = sums["xy"] / np.sqrt(sums["xx"] * sums["yy"])
+            corr = corr.abs().where(vg.size() > 10).reindex(bns)
+            stats["weather_sensitivity"] = corr.fillna(0.0)
+
+        # Total excess energy: mean_residual * grossarea
+        if "grossarea" in df.columns:
+            first = df.drop_duplicates("simscode").set_index("simscode")
+            stats["gross_area"] = first["grossarea"].reindex(bns).astype(float)
+        else:
+            stats["gross_area"] = 1.0
+        stats["total_excess_energy"] = np.maximum(stats["mean_residual"] * stats["gross_area"], 0.0)
+
+        # Volatility: mean of rolling std of residuals
+        rolling_std = g["residual"].rolling(window=96, min_periods=24).std()
+        stats["volatility"] = rolling_std.groupby(level=0).mean().reindex(bns).fillna(0.0)
+
+        columns = [
+            "mean_residual",
+            "mean_abs_residual",
+            "std_residual",
+            "positive_ratio",
+            "latest_actual",
+            "latest_predicted",
+            "latest_diff",
             # New signals
-            predicted = group["predicted"]
-            safe_predicted = predicted.replace(0, np.nan)
-            ratio_series = group["energy_per_sqft"] / safe_predicted - 1
-            excess_ratio = float(ratio_series.mean()) if not ratio_series.isna().all() else 0.0
-
-            # Consistency: fraction of days where daily mean residual > 0
-            group_sorted = group.sort_values("readingtime").copy()
-            group_sorted["date"] = group_sorted["readingtime"].dt.date
-            daily_mean = group_sorted.groupby("date")["residual"].mean()
-            consistency = float((daily_mean > 0).mean()) if len(daily_mean) > 0 else 0.0
-
-            # Peak excess: 95th percentile of positive residuals
-            positive_residuals = residuals[residuals > 0]
-            peak_excess = float(np.percentile(positive_residuals, 95)) if len(positive_residuals) > 0 else 0.0
-
-            # Weather sensitivity: correlation of |residual| with temperature
-            weather_sensitivity = 0.0
-            if "temperature_2m" in group.columns:
-                temp = group["temperature_2m"]
-                abs_res = residuals.abs()
-                valid = temp.notna() & abs_res.notna()
-                if valid.sum() > 10:
-                    corr = abs_res[valid].corr(temp[valid])
-                    weather_sensitivity = float(abs(corr)) if not np.isnan(corr) else 0.0
-
-            # Total excess energy: mean_residual * grossarea
-            gross_area = float(group["grossarea"].iloc[0]) if "grossarea" in group.columns else 1.0
-            total_excess_energy = max(mean_residual * gross_area, 0.0)
-
-            # Volatility: mean of rolling std of residuals
-            rolling_std = residuals.rolling(window=96, min_periods=24).std()
-            volatility = float(rolling_std.mean()) if not rolling_std.isna().all() else 0.0
-
-            n_observations = len(residuals)
-
-            self._metrics[utility][int(bn)] = {
-                "mean_residual": mean_residual,
-                "mean_abs_residual": mean_abs_residual,
-                "std_residual": std_residual,
-                "positive_ratio": positive_ratio,
-                "latest_actual": float(latest["energy_per_sqft"]),
-                "latest_predicted": float(latest["predicted"]),
-                "latest_diff": float(latest["energy_per_sqft"] - latest["predicted"]),
-                # New signals
-                "excess_ratio": excess_ratio,
-                "consistency": consistency,
-                "peak_excess": peak_excess,
-                "weather_sensitivity": weather_sensitivity,
-                "total_excess_energy": total_excess_energy,
-                "volatility": volatility,
-                "gross_area": gross_area,
-                "n_observations": n_observations,
-            }
+            "excess_ratio",
+            "consistency",
+            "peak_excess",
+            "weather_sensitivity",
+            "total_excess_energy",
+            "volatility",
+            "gross_area",
+        ]
+        values = stats[columns].to_numpy(dtype=float).tolist()
+        counts = stats["n_observations"].tolist()
+        self._metrics[utility] = {
+            int(bn): {**dict(zip(columns, row)), "n_observations": n}
+            for bn, row, n in zip(bns, values, counts)
+        }
 
     def _compute_confidence(self, m: dict, portfolio_std: float) -> str:
         n = m["n_observations"]
@@ -204,16 +288,27 @@ class ScoringService:
             return "medium"
         return "high"
 
-    def _compute_signal_details(self, m: dict, all_metrics: dict) -> dict:
-        """Compute signal details with percentiles for a single building."""
+    def _signal_distributions(self, all_metrics: dict) -> dict[str, np.ndarray]:
+        """Sorted portfolio values of each detail signal, for percentile lookups."""
         signal_keys = ["excess_ratio", "positive_ratio", "consistency", "weather_sensitivity", "peak_excess"]
-        building_numbers = list(all_metrics.keys())
+        return {
+            key: np.sort(np.array([m[key] for m in all_metrics.values()], dtype=float))
+            for key in signal_keys
+        }
 
+    def _compute_signal_details(self, m: dict, distributions: dict[str, np.ndarray]) -> dict:
+        """Compute signal details with percentiles for a single building."""
         details = {}
-        for key in signal_keys:
-            all_vals = np.array([all_metrics[bn][key] for bn in building_numbers])
+        for key, sorted_vals in distributions.items():
             val = m[key]
-            pct = float(np.mean(all_vals <= val)) if len(all_vals) > 0 else 0.5
+            n = len(sorted_vals)
+            if n == 0:
+                pct = 0.5
+            elif np.isnan(val):
+                pct = 0.0
+            else:
+                # Share of buildings with value <= val (NaNs sort last, never counted)
+                pct = float(np.searchsorted(sorted_vals, val, side="right") / n)
             meta = SIGNAL_META.get(key, {"label": key, "description": ""})
             details[key] = {
                 "value": round(val, 6),
@@ -298,7 +393,21 @@ class ScoringService:
         return {bn: float(scores[i]) for i, bn in enumerate(building_numbers)}
 
     def get_building_scores(
-        self, utility: str, scoring_method: str = "multi_signal_weighted"
+        self, utility: str, scoring_method: str = DEFAULT_SCORING_METHOD
+    ) -> list[BuildingScore]:
+        if not self._metrics.get(utility):
+            return []
+        scoring_method = resolve_scoring_method(scoring_method)
+        key = (utility, scoring_method)
+        cached = self._score_cache.get(key)
+        if cached is None:
+            cached = self._score_cache[key] = self._build_building_scores(
+                utility, scoring_method
+            )
+        return cached
+
+    def _build_building_scores(
+        self, utility: str, scoring_method: str
     ) -> list[BuildingScore]:
         if utility not in self._metrics:
             return []
@@ -316,12 +425,14 @@ class ScoringService:
             "zscore_portfolio": self._score_zscore_portfolio,
             "multi_signal_percentile": self._score_multi_signal_percentile,
         }
-        score_fn = method_map.get(scoring_method, self._score_multi_signal_weighted)
+        score_fn = method_map[resolve_scoring_method(scoring_method)]
         primary_scores = score_fn(metrics)
 
         # Always compute investment scores (Method B)
         investment_scores = self._score_investment_impact(metrics)
 
+        distributions = self._signal_distributions(metrics)
+
         # Portfolio std for confidence
         all_stds = [metrics[bn]["std_residual"] for bn in building_numbers]
         portfolio_std = float(np.std(all_stds)) if len(all_stds) > 1 else 0.0
@@ -356,7 +467,7 @@ class ScoringService:
                     confidence=confidence,
                     rank=rank_map[bn],
                     total_buildings=total,
-                    signals=self._compute_signal_details(m, metrics),
+                    signals=self._compute_signal_details(m, distributions),
                 )
             )
         return result
@@ -404,17 +515,11 @@ class ScoringService:
             rank = sorted_bns.index(bn) + 1 if bn in sorted_bns else len(building_numbers)
 
             # Signal details
-            signals = self._compute_signal_details(m, metrics)
-
-            units_map = {
-                "ELECTRICITY": "kWh", "GAS": "varies", "HEAT": "varies",
-                "STEAM": "kg", "COOLING": "ton-hours", "COOLING_POWER": "tons",
-                "STEAMRATE": "varies", "OIL28SEC": "varies",
-            }
+            signals = self._compute_signal_details(m, self._signal_distributions(metrics))
 
             by_utility.append({
                 "utility": utility,
-                "units": units_map.get(utility, "varies"),
+                "units": UTILITY_UNITS.get(utility, "varies"),
                 "score": score,
                 "status": _status_from_score(score, self._thresholds),
                 "latestActual": round(m["latest_actual"], 4),
@@ -457,11 +562,10 @@ class ScoringService:
     def recompute(self, utility: str | None = None):
         if utility:
             try:
-                pred_df = self._prediction_service.predict_all(utility)
-                self._compute_metrics(utility, pred_df)
+                self._compute_utility(utility)
             except Exception as e:
                 logger.error("Failed to recompute scores for %s: %s", utility, e)
         else:
-            self._metrics.clear()
             self._available_utilities.clear()
+            self._invalidate()
             self._compute_all()
@@ -2,6 +2,7 @@
 import io
 import logging
 from dataclasses import dataclass, field
+from typing import BinaryIO
 
 import pandas as pd
 
@@ -15,6 +16,10 @@ REQUIRED_WEATHER_COLS = {"date", "temperature_2m"}
 REQUIRED_BUILDING_COLS = {"buildingnumber"}
 
 
+def _as_file(content: bytes | BinaryIO) -> BinaryIO:
+    return io.BytesIO(content) if isinstance(content, bytes) else content
+
+
 @dataclass
 class UploadResult:
     rows_ingested: int = 0
@@ -27,9 +32,9 @@ class UploadService:
         self._data_service = data_service
         self._scoring_service = scoring_service
 
-    def ingest_meter_csv(self, content: bytes) -> UploadResult:
-        """Parse and ingest meter data from CSV bytes."""
-        df = pd.read_csv(io.BytesIO(content))
+    def ingest_meter_csv(self, content: bytes | BinaryIO) -> UploadResult:
+        """Parse and ingest meter data from CSV bytes or a binary file object."""
+        df = pd.read_csv(_as_file(content))
         df.columns = [c.strip().lower() for c in df.columns]
         return self._ingest_meter(df)
 
@@ -83,9 +88,9 @@ class UploadService:
 
         return result
 
-    def ingest_weather_csv(self, content: bytes) -> UploadResult:
-        """Parse and ingest weather data from CSV bytes."""
-        df = pd.read_csv(io.BytesIO(content))
+    def ingest_weather_csv(self, content: bytes | BinaryIO) -> UploadResult:
+        """Parse and ingest weather data from CSV bytes or a binary file object."""
+        df = pd.read_csv(_as_file(content))
         df.columns = [c.strip().lower() for c in df.columns]
         return self._ingest_weather(df)
 
@@ -124,9 +129,9 @@ class UploadService:
 
         return result
 
-    def ingest_building_csv(self, content: bytes) -> UploadResult:
-        """Parse and ingest building data from CSV bytes."""
-        df = pd.read_csv(io.BytesIO(content))
+    def ingest_building_csv(self, content: bytes | BinaryIO) -> UploadResult:
+        """Parse and ingest building data from CSV bytes or a binary file object."""
+        df = pd.read_csv(_as_file(content))
         df.columns = [c.strip().lower() for c in df.columns]
         return self._ingest_building(df)
 
@@ -0,0 +1,69 @@
+"""Adaptive (AIMD) concurrency limit for outbound LLM requests."""
+
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+
+
+class _Slot:
+    throttled = False
+
+
+class AdaptiveLimiter:
+    """Concurrency limit that adapts to upstream throttling.
+
+    Each successful request raises the limit by ``1 / limit`` (about one slot
+    per full window of requests); a throttled one (HTTP 429) halves it. Under
+    bursts the limit settles just below the provider's rate limit, so
+    requests queue here instead of piling into SDK retry backoff.
+    """
+
+    def __init__(self, maximum: int, minimum: int = 1):
+        self._max = maximum
+        self._min = minimum
+        self._limit = float(maximum)
+        self._in_flight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    async def acquire(self):
+        while self._in_flight >= self.limit:
+            fut = asyncio.get_running_loop().create_future()
+            self._waiters.append(fut)
+            try:
+                await fut
+            except asyncio.CancelledError:
+                # Pass on a wake-up we received but can no longer use
+                if fut.done() and not fut.cancelled():
+                    self._wake()
+                raise
+        self._in_flight += 1
+
+    def release(self, throttled: bool = False):
+        self._in_flight -= 1
+        if throttled:
+            self._limit = max(self._min, self._limit / 2)
+        else:
+            self._limit = min(self._max, self._limit + 1 / self._limit)
+        self._wake()
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold one slot for the block; set ``slot.throttled`` on a 429."""
+        await self.acquire()
+        slot = _Slot()
+        try:
+            yield slot
+        finally:
+            self.release(slot.throttled)
+
+    def _wake(self):
+        free = self.limit - self._in_flight
+        while free > 0 and self._waiters:
+            fut = self._waiters.popleft()
+            if not fut.done():
+                fut.set_result(None)
+                free -= 1
@@ -0,0 +1,114 @@
+"""Response classes shared by routers."""
+
+import asyncio
+import uuid
+from collections.abc import AsyncIterator
+
+import orjson
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.types import Send
+
+from app.utils.stream_builder import HEARTBEAT
+
+# Distinguishes ETags across restarts, since data versions restart at 0.
+_BOOT_ID = uuid.uuid4().hex[:8]
+
+CACHE_CONTROL = "private, no-cache"
+
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson.
+
+    Return an instance directly from an endpoint to skip FastAPI's
+    ``jsonable_encoder`` pass; numpy scalars/arrays and datetimes are
+    serialized natively.
+    """
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(
+            content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
+
+
+def make_etag(*versions: int) -> str:
+    return f'W/"{_BOOT_ID}-{"-".join(map(str, versions))}"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of ``etag`` against an If-None-Match header value.
+
+    The header may be ``*`` or a comma-separated list of tags; the ``W/``
+    prefix is ignored on both sides (RFC 9110 §13.1.2).
+    """
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(",")
+    )
+
+
+def not_modified(request: Request, etag: str) -> Response | None:
+    """Return a 304 response if the client already holds ``etag``."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(
+            status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL}
+        )
+    return None
+
+
+class EventStreamResponse(StreamingResponse):
+    """SSE response that writes each event straight to ``send``.
+
+    Events are encoded once and sent as they arrive. If the source is idle
+    for ``heartbeat`` seconds (LLM latency, tool execution) a comment frame
+    is sent so proxies do not drop the connection.
+    """
+
+    media_type = "text/event-stream"
+
+    def __init__(
+        self,
+        events: AsyncIterator[str | bytes],
+        heartbeat: float = 15.0,
+        headers: dict[str, str] | None = None,
+    ):
+        super().__init__(
+            events,
+            headers={"Cache-Control": "no-cache", "Connection": "keep-alive", **(headers or {})},
+        )
+        self._heartbeat = heartbeat
+
+    async def stream_response(self, send: Send) -> None:
+        await send(
+            {"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers}
+        )
+        events = aiter(self.body_iterator)
+        pending: asyncio.Future | None = None
+        try:
+            while True:
+                if pending is None:
+                    pending = asyncio.ensure_future(anext(events))
+                done, _ = await asyncio.wait({pending}, timeout=self._heartbeat)
+                if not done:
+                    await send({"type": "http.response.body", "body": HEARTBEAT, "more_body": True})
+                    continue
+                finished, pending = pending, None
+                try:
+                    event = finished.result()
+                except StopAsyncIteration:
+                    break
+                if isinstance(event, str):
+                    event = event.encode()
+                await send({"type": "http.response.body", "body": event, "more_body": True})
+        finally:
+            if pending is not None:
+                pending.cancel()
+                await asyncio.wait({pending})
+            aclose = getattr(events, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
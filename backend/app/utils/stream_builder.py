@@ -2,6 +2,9 @@
 
 Each event is an SSE line: ``data: {json}\n\n``
 The stream terminates with ``data: [DONE]\n\n``.
+Builders return the encoded frame as bytes, ready to send.
+While the server is busy (e.g. a long tool call) it may send ``: ping\n\n``
+comment frames, which clients ignore.
 
 Event types:
   text-delta    Incremental text chunk
@@ -13,46 +16,77 @@ Event types:
   [DONE]        Stream terminator
 """
 
-import json
 import uuid
 
+import orjson
+
+HEARTBEAT = b": ping\n\n"
+_DONE = b"data: [DONE]\n\n"
+
+# Fixed-shape frames: only the variable value is JSON-encoded per call
+_TEXT_DELTA = b'data: {"type":"text-delta","delta":%s}\n\n'
+_ERROR = b'data: {"type":"error","message":%s}\n\n'
+_STATUS = b'data: {"type":"status","status":%s}\n\n'
+_STATUS_TOOL = b'data: {"type":"status","status":%s,"toolName":%s}\n\n'
+
+
+def dumpb(obj) -> bytes:
+    """Serialize to JSON bytes with orjson (numpy scalars/arrays allowed)."""
+    return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+def _frame(payload: dict) -> bytes:
+    return b"data: " + dumpb(payload) + b"\n\n"
+
 
 def _gen_id(prefix: str = "") -> str:
     return f"{prefix}{uuid.uuid4().hex[:12]}"
 
 
-def text_delta(delta: str) -> str:
-    return f"data: {json.dumps({'type': 'text-delta', 'delta': delta})}\n\n"
+def text_delta(delta: str) -> bytes:
+    return _TEXT_DELTA % orjson.dumps(delta)
+
 
+def tool_start(tool_call_id: str, tool_name: str, args: dict) -> bytes:
+    return _frame({"type": "tool-start", "toolCallId": tool_call_id, "toolName": tool_name, "args": args})
 
-def tool_start(tool_call_id: str, tool_name: str, args: dict) -> str:
-    return f"data: {json.dumps({'type': 'tool-start', 'toolCallId': tool_call_id, 'toolName': tool_name, 'args': args})}\n\n"
 
+def tool_end(
+    tool_call_id: str,
+    output: dict | None = None,
+    error: str | None = None,
+    output_json: bytes | None = None,
+) -> bytes:
+    """Build a tool-end frame.
 
-def tool_end(tool_call_id: str, output: dict | None = None, error: str | None = None) -> str:
+    ``output_json`` is an already-serialized output object; it is spliced into
+    the frame as-is so a result encoded for the LLM tool message is not
+    encoded a second time.
+    """
     payload: dict = {"type": "tool-end", "toolCallId": tool_call_id}
     if error is not None:
         payload["error"] = error
+    elif output_json is not None:
+        return b"data: " + dumpb(payload)[:-1] + b',"output":' + output_json + b"}\n\n"
     else:
         payload["output"] = output or {}
-    return f"data: {json.dumps(payload)}\n\n"
+    return _frame(payload)
 
 
-def error(message: str) -> str:
-    return f"data: {json.dumps({'type': 'error', 'message': message})}\n\n"
+def error(message: str) -> bytes:
+    return _ERROR % orjson.dumps(message)
 
 
-def status(status_value: str, tool_name: str | None = None) -> str:
-    payload: dict = {"type": "status", "status": status_value}
-    if tool_name is not None:
-        payload["toolName"] = tool_name
-    return f"data: {json.dumps(payload)}\n\n"
+def status(status_value: str, tool_name: str | None = None) -> bytes:
+    if tool_name is None:
+        return _STATUS % orjson.dumps(status_value)
+    return _STATUS_TOOL % (orjson.dumps(status_value), orjson.dumps(tool_name))
 
 
-def metadata(message_id: str | None = None) -> str:
+def metadata(message_id: str | None = None) -> bytes:
     mid = message_id or _gen_id("msg-")
-    return f"data: {json.dumps({'type': 'metadata', 'messageId': mid})}\n\n"
+    return _frame({"type": "metadata", "messageId": mid})
 
 
-def done() -> str:
-    return "data: [DONE]\n\n"
+def done() -> bytes:
+    return _DONE
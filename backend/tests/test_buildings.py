@@ -0,0 +1,166 @@
+"""Tests for the buildings endpoints (GET /api/buildings...)."""
+
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pandas as pd
+import pytest
+import pytest_asyncio
+from httpx import ASGITransport
+
+from app.services.data_service import DataService
+from app.services.scoring_service import BuildingScore
+
+
+@pytest.fixture
+def data_service(tmp_path):
+    """Real DataService over two metered buildings."""
+    pd.DataFrame([
+        {"buildingnumber": 311, "buildingname": "Test Building A",
+         "latitude": 40.0, "longitude": -83.0, "grossarea": 10000.0},
+        {"buildingnumber": 376, "buildingname": "Test Building B",
+         "latitude": 40.01, "longitude": -83.01, "grossarea": 20000.0},
+    ]).to_csv(tmp_path / "building_metadata.csv", index=False)
+    pd.DataFrame([
+        {"simscode": bldg, "utility": "ELECTRICITY", "readingtime": t, "readingvalue": 50.0}
+        for bldg in [311, 376]
+        for t in pd.date_range("2025-09-01", periods=8, freq="h")
+    ]).to_csv(tmp_path / "meter-data-1.csv", index=False)
+    return DataService(tmp_path)
+
+
+@pytest.fixture
+def scoring_service():
+    """Mock ScoringService that only has scores for ELECTRICITY."""
+    svc = MagicMock()
+    svc.version = 0
+
+    def get_building_scores(utility, scoring_method="multi_signal_weighted"):
+        if utility != "ELECTRICITY":
+            return []
+        return [
+            BuildingScore(building_number=311, utility=utility, score=0.8, status="warning",
+                          mean_residual=0.0, mean_abs_residual=0.0, std_residual=0.0,
+                          positive_ratio=0.5, latest_actual=0.0, latest_predicted=0.0,
+                          latest_diff=0.0, rank=1, total_buildings=1),
+        ]
+
+    svc.get_building_scores = MagicMock(side_effect=get_building_scores)
+    return svc
+
+
+@pytest_asyncio.fixture
+async def client(data_service, scoring_service):
+    with (
+        patch("app.dependencies._data_service", data_service),
+        patch("app.dependencies._scoring_service", scoring_service),
+        patch("app.dependencies._prediction_service", MagicMock()),
+        patch("app.dependencies.init_services"),
+    ):
+        from app.main import app
+        transport = ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+            yield c
+
+
+@pytest.mark.asyncio
+async def test_list_buildings(client):
+    """GET /api/buildings merges scores into the building list."""
+    response = await client.get("/api/buildings")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["meta"]["totalBuildings"] == 2
+    by_number = {b["buildingNumber"]: b for b in data["buildings"]}
+    assert by_number[311]["anomalyScore"] == 0.8
+    assert by_number[376]["anomalyScore"] is None
+
+
+@pytest.mark.asyncio
+async def test_list_cache_ignores_junk_query_values(client, data_service):
+    """Unknown scoring methods share the default entry; unscored utilities are not cached."""
+    for i in range(20):
+        response = await client.get(f"/api/buildings?scoring=x{i}")
+        assert response.json()["meta"]["scoringMethod"] == "multi_signal_weighted"
+        response = await client.get(f"/api/buildings?utility=junk{i}")
+        assert response.status_code == 200
+
+    assert list(data_service._buildings_payload) == [("ELECTRICITY", "multi_signal_weighted")]
+
+
+@pytest.mark.asyncio
+async def test_list_buildings_not_modified(client):
+    """A matching If-None-Match gets a bodiless 304 with the same ETag."""
+    first = await client.get("/api/buildings")
+    etag = first.headers["etag"]
+
+    response = await client.get("/api/buildings", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+
+@pytest.mark.asyncio
+async def test_etag_changes_after_meter_append(client, data_service):
+    """Appending meter data invalidates previously issued ETags."""
+    etag = (await client.get("/api/buildings")).headers["etag"]
+
+    data_service.append_meter_data(pd.DataFrame([
+        {"simscode": 311, "utility": "ELECTRICITY",
+         "readingtime": "2025-09-01 08:00", "readingvalue": 50.0},
+    ]))
+    response = await client.get("/api/buildings", headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+@pytest.mark.asyncio
+async def test_if_none_match_weak_and_list_forms(client):
+    """If-None-Match matches weakly, within a list, and as a wildcard."""
+    etag = (await client.get("/api/buildings")).headers["etag"]
+    assert etag.startswith('W/"')
+    strong = etag.removeprefix("W/")
+
+    for header in [strong, f'"stale", {etag}', f'W/"stale",{strong}', "*"]:
+        response = await client.get("/api/buildings", headers={"If-None-Match": header})
+        assert response.status_code == 304, header
+
+    for header in ['"stale"', f'{etag[:-2]}x"', ""]:
+        response = await client.get("/api/buildings", headers={"If-None-Match": header})
+        assert response.status_code == 200, header
+
+
+@pytest.mark.asyncio
+async def test_timeseries_not_modified(client):
+    """The timeseries endpoint honours If-None-Match against its data ETag."""
+    first = await client.get("/api/buildings/311/timeseries")
+    assert first.status_code == 200
+
+    response = await client.get(
+        "/api/buildings/311/timeseries", headers={"If-None-Match": first.headers["etag"]}
+    )
+
+    assert response.status_code == 304
+
+
+@pytest.mark.asyncio
+async def test_timeseries_unknown_building_ignores_if_none_match(client):
+    """A matching If-None-Match does not turn a missing building into a 304."""
+    etag = (await client.get("/api/buildings/311/timeseries")).headers["etag"]
+
+    response = await client.get(
+        "/api/buildings/999/timeseries", headers={"If-None-Match": etag}
+    )
+
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_get_unknown_building_skips_detail_scores(client, scoring_service):
+    """A missing building 404s without computing its detail scores."""
+    response = await client.get("/api/buildings/999")
+
+    assert response.status_code == 404
+    scoring_service.get_building_detail_scores.assert_not_called()
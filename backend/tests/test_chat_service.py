@@ -0,0 +1,230 @@
+"""Tests for ChatService internals (streaming, tool result cache)."""
+
+import asyncio
+import contextlib
+import json
+import os
+from collections import OrderedDict
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+import pytest_asyncio
+
+from app.services import chat_service as chat_module
+from app.services.chat_service import ChatService, _is_cacheable_code
+from app.services.code_execution_service import CodeExecutionService
+
+
+def _tool_chunk(arguments: str, tc_id: str | None = None, name: str | None = None) -> dict:
+    fn = {"arguments": arguments}
+    if name:
+        fn["name"] = name
+    tc = {"index": 0, "function": fn}
+    if tc_id:
+        tc["id"] = tc_id
+    return {"choices": [{"delta": {"tool_calls": [tc]}, "finish_reason": None}]}
+
+
+@pytest_asyncio.fixture
+async def chat_service():
+    # A long flush interval, so only the count or a tool call flushes text
+    svc = ChatService(
+        api_key="sk-test",
+        model="test-model",
+        code_execution_service=MagicMock(),
+        prediction_service=MagicMock(),
+        text_flush_interval=60.0,
+    )
+
+    @contextlib.asynccontextmanager
+    async def create(**kwargs):
+        yield None
+
+    svc._client = MagicMock()
+    svc._client.chat.completions.with_streaming_response.create = create
+    svc._client.close = AsyncMock()
+    yield svc
+    await svc.close()
+
+
+@pytest.mark.asyncio
+async def test_text_flushed_before_tool_call_arguments(chat_service):
+    """Buffered text is sent before the tool call's arguments finish streaming."""
+    chunks = [
+        {"choices": [{"delta": {"content": "Let "}, "finish_reason": None}]},
+        {"choices": [{"delta": {"content": "me analyze."}, "finish_reason": None}]},
+        _tool_chunk('{"co', tc_id="call_1", name="execute_python"),
+        *(_tool_chunk(" ") for _ in range(20)),
+        _tool_chunk('de": "print(1)"}'),
+        {"choices": [{"delta": {}, "finish_reason": "stop"}]},
+    ]
+    pulled = []
+
+    async def iter_chunks(response):
+        for chunk in chunks:
+            pulled.append(chunk)
+            yield chunk
+
+    text_at = []
+    with patch.object(chat_module, "_iter_chunks", iter_chunks):
+        async for frame in chat_service.stream_chat([{"role": "user", "content": "Hi"}]):
+            if frame.startswith(b"data: {"):
+                event = json.loads(frame[len(b"data: "):])
+                if event["type"] == "text-delta":
+                    text_at.append((event["delta"], len(pulled)))
+
+    # The first delta goes out at once; the buffered one is flushed by the
+    # first tool-call chunk, not after the whole call has streamed
+    assert text_at == [("Let ", 1), ("me analyze.", 3)]
+
+
+@pytest.mark.asyncio
+async def test_text_flushed_when_upstream_pauses(chat_service):
+    """Buffered text goes out once its interval passes, without waiting for the next chunk."""
+    chat_service._text_flush_interval = 0.01
+    pulled = []
+
+    async def iter_chunks(response):
+        for content in ["Let ", "me think."]:
+            pulled.append(content)
+            yield {"choices": [{"delta": {"content": content}, "finish_reason": None}]}
+        await asyncio.sleep(0.5)  # the model pauses before its next token
+        pulled.append("stop")
+        yield {"choices": [{"delta": {}, "finish_reason": "stop"}]}
+
+    text_at = []
+    with patch.object(chat_module, "_iter_chunks", iter_chunks):
+        async for frame in chat_service.stream_chat([{"role": "user", "content": "Hi"}]):
+            if frame.startswith(b"data: {"):
+                event = json.loads(frame[len(b"data: "):])
+                if event["type"] == "text-delta":
+                    text_at.append((event["delta"], len(pulled)))
+
+    assert text_at == [("Let ", 1), ("me think.", 2)]
+
+
+@pytest.mark.parametrize(
+    "code",
+    [
+        "df = pd.read_csv(data.meter_sept)\nprint(df.describe())",
+        "x = np.arange(10)\nprint(x.mean())",
+        "import pandas as pd\nprint(pd.__version__)",
+        "plt.plot([1, 2, 3])\nplt.show()",
+    ],
+)
+def test_cacheable_code(code):
+    assert _is_cacheable_code(code)
+
+
+@pytest.mark.parametrize(
+    "code",
+    [
+        "print(open('/etc/passwd').read())",
+        "import os\nprint(os.listdir('.'))",
+        "from os import path\nprint(path.exists('x'))",
+        "import os.path",
+        "from subprocess import run",
+        "print(np.random.rand(3))",
+        "rng = np.random.default_rng()\nprint(rng.integers(0, 9))",
+        "print(pd.Timestamp.now())",
+        "df.to_csv('out.csv')",
+        "plt.savefig('chart.png')",
+        "exec('print(1)')",
+        "print(__import__('os').getcwd())",
+        "import time\nprint(time.time())",
+        "import random\nprint(random.random())",
+        "import numpy.random as npr\nprint(npr.rand())",
+        "from numpy.random import default_rng",
+        "from datetime import datetime as dt\nprint(dt.now())",
+        "print(pd.Timestamp.utcnow())",
+        "print(pd.Timestamp('now'))",
+        "print(pd.to_datetime('today'))",
+        "import secrets\nprint(secrets.token_hex())",
+        "print(1 +",  # syntax error
+    ],
+)
+def test_uncacheable_code(code):
+    assert not _is_cacheable_code(code)
+
+
+@pytest.mark.asyncio
+async def test_code_cache_skips_results_with_images(chat_service):
+    """Text-only results are reused; results with charts are always re-run."""
+    text = {"stdout": "45\n", "stderr": "", "exitCode": 0, "images": []}
+    chart = {"stdout": "", "stderr": "", "exitCode": 0, "images": ["data:image/png;base64,AAAA"]}
+    chat_service._run_code = AsyncMock(side_effect=[text, chart, chart])
+    cache = OrderedDict()
+
+    for _ in range(2):
+        assert await chat_service._execute_tool_limited("execute_python", {"code": "print(45)"}, cache) == text
+    for _ in range(2):
+        assert await chat_service._execute_tool_limited("execute_python", {"code": "plt.show()"}, cache) == chart
+
+    assert chat_service._run_code.await_count == 3
+    assert len(cache) == 1
+
+
+@pytest.mark.asyncio
+async def test_code_cache_does_not_replay_timing(chat_service):
+    """A cache hit returns the output without the original run's executionTime."""
+    fresh = {"stdout": "45\n", "stderr": "", "exitCode": 0, "images": [], "executionTime": 1.5}
+    chat_service._run_code = AsyncMock(return_value=fresh)
+    cache = OrderedDict()
+
+    first = await chat_service._execute_tool_limited("execute_python", {"code": "print(45)"}, cache)
+    replay = await chat_service._execute_tool_limited("execute_python", {"code": "print(45)"}, cache)
+
+    assert first == fresh
+    assert "executionTime" not in replay
+    assert replay == {k: v for k, v in fresh.items() if k != "executionTime"}
+    assert chat_service._run_code.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_code_cache_scoped_to_stream_and_data_version(chat_service):
+    """Results are reused only within one cache and one data version."""
+    text = {"stdout": "45\n", "stderr": "", "exitCode": 0, "images": []}
+    chat_service._run_code = AsyncMock(return_value=text)
+    chat_service._data_service = MagicMock(version=0)
+    first, second = OrderedDict(), OrderedDict()
+
+    await chat_service._execute_tool_limited("execute_python", {"code": "print(45)"}, first)
+    await chat_service._execute_tool_limited("execute_python", {"code": "print(45)"}, second)
+    await chat_service._execute_tool_limited("execute_python", {"code": "print(45)"})
+    assert chat_service._run_code.await_count == 3
+
+    await chat_service._execute_tool_limited("execute_python", {"code": "print(45)"}, first)
+    assert chat_service._run_code.await_count == 3
+    chat_service._data_service.version = 1  # an upload landed
+    await chat_service._execute_tool_limited("execute_python", {"code": "print(45)"}, first)
+    assert chat_service._run_code.await_count == 4
+
+
+@pytest.mark.asyncio
+async def test_execute_python_in_worker_process(tmp_path):
+    """With workers configured, code runs in a spawned process and crashes are recovered."""
+    svc = ChatService(
+        api_key="sk-test",
+        model="test-model",
+        code_execution_service=CodeExecutionService(str(tmp_path)),
+        prediction_service=MagicMock(),
+        code_execution_workers=1,
+    )
+    try:
+        result = await svc._execute_tool_limited(
+            "execute_python", {"code": "import os\nprint(os.getpid())"}
+        )
+        assert result["exitCode"] == 0
+        assert int(result["stdout"]) != os.getpid()
+
+        crashed = await svc._execute_tool_limited(
+            "execute_python", {"code": "import os\nos._exit(1)"}
+        )
+        assert crashed == {"error": "Code execution worker crashed"}
+
+        again = await svc._execute_tool_limited(
+            "execute_python", {"code": "print(6 * 7)"}
+        )
+        assert again["stdout"] == "42\n"
+    finally:
+        await svc.close()
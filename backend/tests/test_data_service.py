@@ -0,0 +1,222 @@
+"""Tests for DataService meter lookups and aggregation."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.data_service import DataService, _bucket_sums
+
+
+@pytest.fixture
+def data_service(tmp_path):
+    """DataService over one building's hourly readings plus a NaT reading."""
+    pd.DataFrame([
+        {"buildingnumber": 311, "buildingname": "Test Building A",
+         "latitude": 40.0, "longitude": -83.0, "grossarea": 10000.0},
+    ]).to_csv(tmp_path / "building_metadata.csv", index=False)
+
+    times = pd.date_range("2025-09-01", periods=6, freq="h")
+    rows = [
+        {"simscode": 311, "utility": "ELECTRICITY", "readingtime": t, "readingvalue": float(i)}
+        for i, t in enumerate(times)
+    ]
+    rows.insert(2, {"simscode": 311, "utility": "ELECTRICITY", "readingtime": "not a date", "readingvalue": 99.0})
+    pd.DataFrame(rows).to_csv(tmp_path / "meter-data-1.csv", index=False)
+    return DataService(tmp_path)
+
+
+def test_meter_data_start_only_range_drops_nat(data_service):
+    """A start-only range excludes NaT readings, as the comparison mask did."""
+    df = data_service.get_meter_data(311, "ELECTRICITY", start=pd.Timestamp("2025-09-01 02:00"))
+
+    assert df["readingtime"].notna().all()
+    assert df["readingvalue"].tolist() == [2.0, 3.0, 4.0, 5.0]
+
+
+def test_meter_data_bounded_ranges(data_service):
+    """End-only and two-sided ranges are inclusive and drop NaT readings."""
+    end_only = data_service.get_meter_data(311, "ELECTRICITY", end=pd.Timestamp("2025-09-01 01:00"))
+    both = data_service.get_meter_data(
+        311, "ELECTRICITY",
+        start=pd.Timestamp("2025-09-01 01:00"), end=pd.Timestamp("2025-09-01 03:00"),
+    )
+    past_end = data_service.get_meter_data(311, "ELECTRICITY", start=pd.Timestamp("2025-09-02"))
+
+    assert end_only["readingvalue"].tolist() == [0.0, 1.0]
+    assert both["readingvalue"].tolist() == [1.0, 2.0, 3.0]
+    assert past_end.empty
+
+
+def test_meter_data_unbounded_keeps_nat(data_service):
+    """Without bounds every reading is returned, NaT included."""
+    df = data_service.get_meter_data(311, "ELECTRICITY")
+
+    assert len(df) == 7
+    assert df["readingtime"].isna().sum() == 1
+
+
+def _append_hour(data_service, value: float):
+    data_service.append_meter_data(pd.DataFrame([
+        {"simscode": 311, "utility": "ELECTRICITY",
+         "readingtime": "2025-09-01 06:00", "readingvalue": value},
+    ]))
+
+
+def test_aggregate_built_during_append_is_not_cached(data_service, monkeypatch):
+    """An aggregate computed from pre-append data is not stored after the append."""
+    build = data_service._aggregate_meter_data
+
+    def racing_build(*args, **kwargs):
+        stale = build(*args, **kwargs)
+        monkeypatch.setattr(data_service, "_aggregate_meter_data", build)
+        _append_hour(data_service, 100.0)  # lands while the build is in flight
+        return stale
+
+    monkeypatch.setattr(data_service, "_aggregate_meter_data", racing_build)
+    stale = data_service.get_aggregated_meter_data(311, "ELECTRICITY", "hourly")
+    fresh = data_service.get_aggregated_meter_data(311, "ELECTRICITY", "hourly")
+
+    assert len(stale) == 6
+    assert len(fresh) == 7
+    assert fresh["readingvalue_sum"].iloc[-1] == 100.0
+
+
+def test_aggregate_cache_bounded_by_meter_index(data_service):
+    """Only hourly/daily aggregates of metered pairs are memoized."""
+    hourly = data_service.get_aggregated_meter_data(311, "ELECTRICITY", "hourly")
+    daily = data_service.get_aggregated_meter_data(311, "ELECTRICITY", "daily")
+    for i in range(5):
+        assert data_service.get_aggregated_meter_data(311, f"junk{i}").empty
+        data_service.get_aggregated_meter_data(311, "ELECTRICITY", f"x{i}")
+        data_service.get_aggregated_meter_data(999, "ELECTRICITY", "daily")
+
+    assert set(data_service._aggregates) == {
+        (311, "ELECTRICITY", "hourly"), (311, "ELECTRICITY", "daily"),
+    }
+    assert data_service.get_aggregated_meter_data(311, "ELECTRICITY", "hourly") is hourly
+    assert data_service.get_aggregated_meter_data(311, "ELECTRICITY", "daily") is daily
+
+
+def test_buildings_payload_reset_by_scores_and_appends(data_service):
+    """Payloads are built once per score version and dropped on append."""
+    builds = []
+
+    def build():
+        builds.append(1)
+        return b"{}", [311]
+
+    def payload(scores_version):
+        return data_service.get_buildings_payload("ELECTRICITY", "m", scores_version, build)
+
+    first = payload(0)
+    assert payload(0) is first
+    assert len(builds) == 1
+
+    payload(1)
+    assert len(builds) == 2
+    _append_hour(data_service, 100.0)
+    assert data_service._buildings_payload == {}
+    payload(1)
+    assert len(builds) == 3
+
+
+def test_meter_index_built_during_append_is_not_cached(data_service):
+    """A meter index built from pre-append data is not stored after the append."""
+    data_service._meter_index = None
+    meter_data = data_service._meter_data
+
+    class RacingFrame:
+        """Proxies the meter frame, appending once the build has read it."""
+
+        def __init__(self):
+            self.raced = False
+
+        def __getattr__(self, name):
+            return getattr(meter_data, name)
+
+        def __getitem__(self, key):
+            if not self.raced:
+                self.raced = True
+                data_service._meter_data = meter_data
+                _append_hour(data_service, 100.0)
+            return meter_data[key]
+
+    data_service._meter_data = RacingFrame()
+    data_service._get_meter_index()
+
+    assert data_service._meter_index is None
+    df = data_service.get_meter_data(311, "ELECTRICITY", start=pd.Timestamp("2025-09-01 06:00"))
+    assert df["readingvalue"].tolist() == [100.0]
+
+
+def _times(*stamps: str) -> np.ndarray:
+    return pd.to_datetime(list(stamps)).to_numpy()
+
+
+def _groupby_reference(times: np.ndarray, values: np.ndarray, freq: str) -> pd.DataFrame:
+    """The pandas groupby aggregation _bucket_sums replaces."""
+    df = pd.DataFrame({"readingtime": times, "readingvalue": values}).dropna(subset=["readingtime"])
+    agg = df.groupby(df["readingtime"].dt.floor(freq))["readingvalue"].agg(["sum", "mean", "count"])
+    return agg.reset_index().set_axis(
+        ["timestamp", "readingvalue_sum", "readingvalue_mean", "count"], axis=1
+    )
+
+
+def test_bucket_sums_empty():
+    result = _bucket_sums(np.array([], dtype="datetime64[ns]"), np.array([]), "h")
+
+    assert result.empty
+    assert list(result.columns) == ["timestamp", "readingvalue_sum", "readingvalue_mean", "count"]
+
+
+def test_bucket_sums_single_bucket():
+    times = _times("2025-09-01 10:00", "2025-09-01 10:15", "2025-09-01 10:45")
+    result = _bucket_sums(times, np.array([1.0, 2.0, 6.0]), "h")
+
+    assert result["timestamp"].tolist() == [pd.Timestamp("2025-09-01 10:00")]
+    assert result["readingvalue_sum"].tolist() == [9.0]
+    assert result["readingvalue_mean"].tolist() == [3.0]
+    assert result["count"].tolist() == [3]
+
+
+def test_bucket_sums_all_nan_bucket():
+    """A bucket with only NaN values sums to 0 with a NaN mean, like groupby."""
+    times = _times("2025-09-01 10:00", "2025-09-01 11:00", "2025-09-01 11:30", "2025-09-01 12:00")
+    values = np.array([1.0, np.nan, np.nan, 4.0])
+    result = _bucket_sums(times, values, "h")
+
+    assert result["readingvalue_sum"].tolist() == [1.0, 0.0, 4.0]
+    assert np.isnan(result["readingvalue_mean"].iloc[1])
+    assert result["count"].tolist() == [1, 0, 1]
+
+
+def test_bucket_sums_trailing_nat_dropped():
+    times = np.concatenate([
+        _times("2025-09-01 10:00", "2025-09-02 09:00"),
+        np.array(["NaT", "NaT"], dtype="datetime64[ns]"),
+    ])
+    result = _bucket_sums(times, np.array([1.0, 2.0, 50.0, 60.0]), "D")
+
+    assert result["timestamp"].tolist() == [pd.Timestamp("2025-09-01"), pd.Timestamp("2025-09-02")]
+    assert result["readingvalue_sum"].tolist() == [1.0, 2.0]
+
+    only_nat = _bucket_sums(np.array(["NaT"], dtype="datetime64[ns]"), np.array([5.0]), "h")
+    assert only_nat.empty
+
+
+@pytest.mark.parametrize("unit, freq", [("h", "h"), ("D", "D")])
+def test_bucket_sums_matches_groupby(unit, freq):
+    rng = np.random.default_rng(0)
+    times = np.sort(
+        pd.Timestamp("2025-09-01").to_datetime64()
+        + rng.integers(0, 4 * 24 * 60, 500).astype("timedelta64[m]")
+    ).astype("datetime64[us]")
+    values = rng.normal(50.0, 10.0, 500)
+    values[rng.random(500) < 0.2] = np.nan
+    times = np.concatenate([times, np.array(["NaT"] * 3, dtype=times.dtype)])
+    values = np.concatenate([values, [1.0, 2.0, 3.0]])
+
+    result = _bucket_sums(times, values, unit)
+    expected = _groupby_reference(times, values, freq)
+
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
@@ -0,0 +1,28 @@
+"""Tests for the raw ASGI health route."""
+
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_health_get(test_client):
+    response = await test_client.get("/")
+
+    assert response.status_code == 200
+    assert response.json() == {"status": "ok"}
+
+
+@pytest.mark.asyncio
+async def test_health_head_has_no_body(test_client):
+    """HEAD gets the GET headers, including Content-Length, but no body."""
+    response = await test_client.head("/")
+
+    assert response.status_code == 200
+    assert response.content == b""
+    assert response.headers["content-length"] == str(len(b'{"status":"ok"}'))
+
+
+@pytest.mark.asyncio
+async def test_health_not_in_openapi(test_client):
+    schema = (await test_client.get("/openapi.json")).json()
+
+    assert "/" not in schema["paths"]
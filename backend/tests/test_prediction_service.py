@@ -0,0 +1,57 @@
+"""Tests for PredictionService model loading and inference."""
+
+from unittest.mock import MagicMock
+
+import numpy as np
+from xgboost import XGBRegressor
+
+from app.services.prediction_service import PredictionService
+
+
+def _train_early_stopped(path, n_estimators: int = 200) -> XGBRegressor:
+    """Fit a tiny regressor that stops well before ``n_estimators`` rounds."""
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(200, 4))
+    y = X[:, 0] + rng.normal(scale=2.0, size=200)
+    model = XGBRegressor(
+        n_estimators=n_estimators,
+        learning_rate=0.5,
+        max_depth=4,
+        early_stopping_rounds=5,
+    )
+    model.fit(X[:150], y[:150], eval_set=[(X[150:], y[150:])], verbose=False)
+    model.save_model(str(path))
+    return model
+
+
+def test_predict_stops_at_best_iteration(tmp_path):
+    """Raw Booster predictions match XGBRegressor.predict on early-stopped models."""
+    trained = _train_early_stopped(tmp_path / "model_best.json")
+    assert trained.best_iteration < 199
+
+    reference = XGBRegressor()
+    reference.load_model(str(tmp_path / "model_best.json"))
+    X = np.random.default_rng(1).normal(size=(50, 4))
+
+    svc = PredictionService(MagicMock(), tmp_path)
+    got = svc._predict("ELECTRICITY", X)
+
+    np.testing.assert_allclose(got, reference.predict(X), rtol=1e-6)
+    all_trees = svc._models["ELECTRICITY"].inplace_predict(X.astype(np.float32))
+    assert not np.allclose(got, all_trees)
+
+
+def test_predict_uses_all_trees_without_best_iteration(tmp_path):
+    """Models saved without early stopping score every tree."""
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(100, 4))
+    model = XGBRegressor(n_estimators=20, max_depth=3)
+    model.fit(X, X[:, 0])
+    model.save_model(str(tmp_path / "model_best.json"))
+
+    svc = PredictionService(MagicMock(), tmp_path)
+
+    assert svc._iteration_ranges["ELECTRICITY"] == (0, 0)
+    np.testing.assert_allclose(
+        svc._predict("ELECTRICITY", X), model.predict(X), rtol=1e-6
+    )
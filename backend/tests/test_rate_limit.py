@@ -0,0 +1,129 @@
+"""Tests for the AIMD concurrency limiter (app.utils.rate_limit)."""
+
+import asyncio
+
+import pytest
+
+from app.utils.rate_limit import AdaptiveLimiter
+
+
+async def _settle():
+    """Let woken waiters run."""
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_throttle_halves_and_success_adds_reciprocal():
+    limiter = AdaptiveLimiter(8)
+
+    await limiter.acquire()
+    limiter.release(throttled=True)
+    assert limiter._limit == 4.0
+    assert limiter.limit == 4
+
+    await limiter.acquire()
+    limiter.release()
+    assert limiter._limit == pytest.approx(4.25)
+
+    # About one slot per window of successes: each adds 1 / current limit,
+    # so 4 -> 5 takes just over four
+    for _ in range(3):
+        await limiter.acquire()
+        limiter.release()
+    assert limiter.limit == 4
+    await limiter.acquire()
+    limiter.release()
+    assert limiter.limit == 5
+
+
+@pytest.mark.asyncio
+async def test_limit_bounded_by_minimum_and_maximum():
+    limiter = AdaptiveLimiter(4, minimum=2)
+
+    for _ in range(5):
+        await limiter.acquire()
+        limiter.release(throttled=True)
+    assert limiter._limit == 2.0
+
+    for _ in range(50):
+        await limiter.acquire()
+        limiter.release()
+    assert limiter._limit == 4.0
+
+
+@pytest.mark.asyncio
+async def test_acquire_waits_at_limit():
+    limiter = AdaptiveLimiter(2)
+    await limiter.acquire()
+    await limiter.acquire()
+
+    waiter = asyncio.create_task(limiter.acquire())
+    await _settle()
+    assert not waiter.done()
+
+    limiter.release()
+    await _settle()
+    assert waiter.done()
+    assert limiter._in_flight == 2
+
+
+@pytest.mark.asyncio
+async def test_waiters_released_only_below_shrunk_limit():
+    limiter = AdaptiveLimiter(4)
+    for _ in range(4):
+        await limiter.acquire()
+    waiters = [asyncio.create_task(limiter.acquire()) for _ in range(2)]
+    await _settle()
+
+    # 429: limit 4 -> 2 with 3 still in flight, so nobody may start yet
+    limiter.release(throttled=True)
+    await _settle()
+    assert not any(w.done() for w in waiters)
+
+    # 2 in flight against a limit of 2.5 (int 2): still full
+    limiter.release()
+    await _settle()
+    assert not any(w.done() for w in waiters)
+
+    # Each release below the limit admits one waiter, never more
+    limiter.release()
+    await _settle()
+    assert sum(w.done() for w in waiters) == 1
+    assert limiter._in_flight == 2
+
+    limiter.release()
+    await _settle()
+    assert all(w.done() for w in waiters)
+    assert limiter._in_flight <= limiter.limit
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_passes_on_wakeup():
+    limiter = AdaptiveLimiter(1)
+    await limiter.acquire()
+    first = asyncio.create_task(limiter.acquire())
+    second = asyncio.create_task(limiter.acquire())
+    await _settle()
+
+    # Wake the first waiter, then cancel it before it runs
+    limiter.release()
+    first.cancel()
+    await _settle()
+
+    assert first.cancelled()
+    assert second.done()
+    assert limiter._in_flight == 1
+
+
+@pytest.mark.asyncio
+async def test_slot_releases_and_reports_throttle():
+    limiter = AdaptiveLimiter(4)
+
+    with pytest.raises(RuntimeError):
+        async with limiter.slot() as slot:
+            slot.throttled = True
+            raise RuntimeError("429")
+
+    assert limiter._in_flight == 0
+    assert limiter._limit == 2.0
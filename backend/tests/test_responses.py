@@ -0,0 +1,119 @@
+"""Tests for shared response classes (app.utils.responses)."""
+
+import asyncio
+
+import pytest
+from starlette.requests import ClientDisconnect
+
+from app.utils.responses import EventStreamResponse
+from app.utils.stream_builder import HEARTBEAT
+
+
+def _scope(spec_version: str = "2.3") -> dict:
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0", "spec_version": spec_version},
+        "method": "POST",
+        "path": "/api/chat",
+        "headers": [],
+    }
+
+
+async def _never_disconnect():
+    await asyncio.Event().wait()
+
+
+@pytest.mark.asyncio
+async def test_idle_stream_sends_heartbeat():
+    """Comment frames fill idle gaps; events still arrive in order."""
+
+    async def events():
+        yield b"data: first\n\n"
+        await asyncio.sleep(0.05)
+        yield "data: second\n\n"
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    response = EventStreamResponse(events(), heartbeat=0.01)
+    await response(_scope(), _never_disconnect, send)
+
+    assert sent[0]["type"] == "http.response.start"
+    bodies = [m["body"] for m in sent[1:]]
+    assert bodies[0] == b"data: first\n\n"
+    assert HEARTBEAT in bodies[1:-2]
+    assert bodies[-2:] == [b"data: second\n\n", b""]
+    assert sent[-1]["more_body"] is False
+
+
+@pytest.mark.asyncio
+async def test_busy_stream_sends_no_heartbeat():
+    async def events():
+        for i in range(3):
+            yield f"data: {i}\n\n"
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    await EventStreamResponse(events(), heartbeat=10.0)(_scope(), _never_disconnect, send)
+
+    assert HEARTBEAT not in [m.get("body") for m in sent]
+
+
+@pytest.mark.asyncio
+async def test_disconnect_cancels_pending_event():
+    """A client disconnect cancels the generator's in-flight step and closes it."""
+    state = {"cancelled": False, "closed": False}
+    first_sent = asyncio.Event()
+
+    async def events():
+        try:
+            yield b"data: first\n\n"
+            try:
+                await asyncio.sleep(30)  # e.g. a long LLM call
+            except asyncio.CancelledError:
+                state["cancelled"] = True
+                raise
+            yield b"data: never\n\n"
+        finally:
+            state["closed"] = True
+
+    async def send(message):
+        if message.get("body") == b"data: first\n\n":
+            first_sent.set()
+
+    async def receive():
+        await first_sent.wait()
+        return {"type": "http.disconnect"}
+
+    response = EventStreamResponse(events(), heartbeat=0.01)
+    await asyncio.wait_for(response(_scope(), receive, send), timeout=2)
+
+    assert state == {"cancelled": True, "closed": True}
+
+
+@pytest.mark.asyncio
+async def test_send_failure_closes_generator():
+    """On ASGI 2.4+ servers a disconnect surfaces as OSError from send."""
+    state = {"closed": False}
+
+    async def events():
+        try:
+            while True:
+                yield b"data: tick\n\n"
+        finally:
+            state["closed"] = True
+
+    async def send(message):
+        if message.get("body"):
+            raise OSError("connection reset")
+
+    response = EventStreamResponse(events())
+    with pytest.raises(ClientDisconnect):
+        await asyncio.wait_for(response(_scope("2.4"), _never_disconnect, send), timeout=2)
+
+    assert state["closed"]
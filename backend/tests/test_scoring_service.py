@@ -0,0 +1,69 @@
+"""Tests for ScoringService score caching."""
+
+from unittest.mock import MagicMock
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.scoring_service import SCORING_METHODS, ScoringService, _percentile_ranks
+
+
+def _make_pred_df() -> pd.DataFrame:
+    """Synthetic predict_all output: 3 buildings, 96 intervals each."""
+    rng = np.random.default_rng(0)
+    frames = []
+    for bldg in [311, 376, 402]:
+        n = 96
+        predicted = rng.normal(0.01, 0.002, n)
+        actual = predicted + rng.normal(0.0, 0.001, n)
+        frames.append(pd.DataFrame({
+            "simscode": bldg,
+            "readingtime": pd.date_range("2025-09-01", periods=n, freq="15min"),
+            "energy_per_sqft": actual,
+            "predicted": predicted,
+            "residual": actual - predicted,
+            "temperature_2m": rng.normal(70.0, 5.0, n),
+            "grossarea": 10000.0,
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+@pytest.fixture
+def scoring_service():
+    data_svc = MagicMock()
+    data_svc.version = 0
+    pred_svc = MagicMock()
+    pred_svc.get_available_utilities = MagicMock(return_value=["ELECTRICITY"])
+    pred_svc.predict_all = MagicMock(return_value=_make_pred_df())
+    return ScoringService(data_service=data_svc, prediction_service=pred_svc)
+
+
+def test_unknown_scoring_method_shares_default_entry(scoring_service):
+    """Unknown method names resolve to the default and reuse its cache entry."""
+    default = scoring_service.get_building_scores("ELECTRICITY")
+
+    for i in range(50):
+        assert scoring_service.get_building_scores("ELECTRICITY", f"x{i}") is default
+    assert len(scoring_service._score_cache) == 1
+
+
+def test_score_cache_bounded_by_known_methods(scoring_service):
+    """Only scored utilities and known methods are cached."""
+    for method in SCORING_METHODS:
+        assert len(scoring_service.get_building_scores("ELECTRICITY", method)) == 3
+    assert scoring_service.get_building_scores("NOPE") == []
+    assert scoring_service.get_building_scores("NOPE", "investment_impact") == []
+
+    assert len(scoring_service._score_cache) == len(SCORING_METHODS)
+
+
+def test_percentile_ranks_break_ties_by_index():
+    """Tied values get ascending ranks in input order."""
+    values = np.array([2.0] * 20 + [1.0] * 20 + [3.0])
+
+    ranks = _percentile_ranks(values) * (len(values) - 1)
+
+    np.testing.assert_array_equal(ranks[20:40], np.arange(20))
+    np.testing.assert_array_equal(ranks[:20], np.arange(20, 40))
+    assert ranks[40] == 40